@@ -0,0 +1,220 @@
+from __future__ import annotations
+import sys
+import threading
+import time
+import wave
+from typing import BinaryIO, Callable, Optional, Protocol
+import numpy as np
+
+# callback(outdata, frames, time_info, status), as for sounddevice.OutputStream:
+# fill outdata (frames, channels) float32 in place; time_info is None when the
+# backend has no DAC clock (thread backends)
+Callback = Callable[[np.ndarray, int, object, object], None]
+
+
+class AudioBackend(Protocol):
+    """
+    Where AudioEngine's blocks go. The backend calls `callback` once per block,
+    from its own thread, with the sounddevice callback contract.
+    """
+    def open(self, callback: Callback, sr: int, blocksize: int, channels: int) -> None: ...
+    def start(self) -> None: ...
+    def stop(self) -> None:
+        """Stop calling back as soon as possible (current block may complete)."""
+        ...
+    def close(self) -> None: ...
+
+
+###############################################################################
+##                               SOUNDDEVICE                                 ##
+###############################################################################
+
+class SoundDeviceBackend(AudioBackend):
+    """PortAudio output stream (the audio device)."""
+    def __init__(self, latency="low", device=None):
+        self.latency = latency
+        self.device = device
+        self.stream = None
+
+    def open(self, callback: Callback, sr: int, blocksize: int, channels: int) -> None:
+        import sounddevice as sd        # PortAudio is only loaded for this backend
+        self.stream = sd.OutputStream(
+            channels=channels,
+            samplerate=sr,
+            blocksize=blocksize,
+            callback=callback,
+            latency=self.latency,
+            device=self.device,
+        )
+
+    def start(self) -> None:
+        self.stream.start()
+
+    def stop(self) -> None:
+        # abort() is immediate; stop() drains—abort helps kill callback loop promptly
+        try:
+            self.stream.abort()
+        except Exception:
+            pass
+        try:
+            self.stream.stop()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        except Exception:
+            pass
+
+
+###############################################################################
+##                          THREAD-DRIVEN BACKENDS                           ##
+###############################################################################
+
+class BlockThreadBackend(AudioBackend):
+    """
+    Calls the callback from a plain thread and hands each block to `_consume`.
+    realtime=True paces blocks on the wall clock (like a device); False runs as
+    fast as possible. `max_blocks` stops the thread after that many blocks
+    (see `join`). There is no device to choose a block size: blocksize=0
+    (variable) runs DEFAULT_BLOCKSIZE frames per block.
+    """
+    DEFAULT_BLOCKSIZE = 256
+
+    def __init__(self, realtime: bool = True, max_blocks: Optional[int] = None):
+        self.realtime = bool(realtime)
+        self.max_blocks = max_blocks
+        self.blocks = 0                 # blocks produced so far
+        self._run = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self, callback: Callback, sr: int, blocksize: int, channels: int) -> None:
+        self._callback = callback
+        self.sr = int(sr)
+        if int(blocksize) < 0:
+            raise ValueError(f"blocksize must be >= 0 (0: variable), got {blocksize}.")
+        self.blocksize = int(blocksize) or self.DEFAULT_BLOCKSIZE
+        self.channels = int(channels)
+        self._out = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+
+    def start(self) -> None:
+        self._run.set()
+        self._thread = threading.Thread(target=self._loop, name=f"{type(self).__name__}Thread",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._run.clear()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def close(self) -> None:
+        pass
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the thread to end (max_blocks reached). True if it did."""
+        th = self._thread
+        if th is not None:
+            th.join(timeout)
+            return not th.is_alive()
+        return True
+
+    def _consume(self, block: np.ndarray) -> None:
+        pass
+
+    def _loop(self) -> None:
+        period = self.blocksize / float(self.sr)
+        out = self._out
+        status = 0
+        next_t = time.perf_counter()
+        while self._run.is_set():
+            if self.max_blocks is not None and self.blocks >= self.max_blocks:
+                break
+            self._callback(out, self.blocksize, None, status)
+            self._consume(out)
+            self.blocks += 1
+            if self.realtime:
+                next_t += period
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -period:
+                    next_t = time.perf_counter()    # late by more than a block: resync
+        self._run.clear()
+
+
+class NullBackend(BlockThreadBackend):
+    """Runs the engine and discards its output (load tests, benchmarks)."""
+
+
+class WavFileBackend(BlockThreadBackend):
+    """Writes the engine output to a 16-bit WAV file, as fast as possible by default."""
+    def __init__(self, path: str, realtime: bool = False, max_blocks: Optional[int] = None):
+        super().__init__(realtime=realtime, max_blocks=max_blocks)
+        self.path = path
+        self._wav: Optional[wave.Wave_write] = None
+
+    def open(self, callback: Callback, sr: int, blocksize: int, channels: int) -> None:
+        super().open(callback, sr, blocksize, channels)
+        self._wav = wave.open(self.path, mode='wb')
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(2)  # 16-bit
+        self._wav.setframerate(self.sr)
+
+    def _consume(self, block: np.ndarray) -> None:
+        self._wav.writeframes((np.clip(block, -1.0, 1.0) * 32767.0).astype(np.int16).tobytes())
+
+    def close(self) -> None:
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class PipeBackend(BlockThreadBackend):
+    """
+    Raw interleaved PCM to a binary stream (stdout by default), e.g. for
+    `python demo.py | ffplay -f f32le -ar 44100 -ac 2 -`.
+    fmt: "f32" (float32 little endian) or "s16" (int16 little endian).
+    Real-time paced by default; a closed pipe stops the backend. When writing to
+    stdout, print() output goes to stderr until `close`.
+    """
+    FORMATS = ("f32", "s16")
+
+    def __init__(self, stream: Optional[BinaryIO] = None, fmt: str = "f32",
+                 realtime: bool = True, max_blocks: Optional[int] = None):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown PCM format '{fmt}', expected one of {self.FORMATS}.")
+        super().__init__(realtime=realtime, max_blocks=max_blocks)
+        self.stream = stream
+        self.fmt = fmt
+        self._stdout = None     # sys.stdout while redirected to stderr
+
+    def open(self, callback: Callback, sr: int, blocksize: int, channels: int) -> None:
+        super().open(callback, sr, blocksize, channels)
+        if self.stream is None:
+            self.stream = sys.stdout.buffer
+        if self._stdout is None and self.stream is getattr(sys.stdout, "buffer", None):
+            self._stdout = sys.stdout
+            sys.stdout = sys.stderr     # keep prints (meter, messages) out of the PCM stream
+
+    def _consume(self, block: np.ndarray) -> None:
+        if self.fmt == "f32":
+            data = block.astype('<f4').tobytes()
+        else:
+            data = (np.clip(block, -1.0, 1.0) * 32767.0).astype('<i2').tobytes()
+        try:
+            self.stream.write(data)
+        except (BrokenPipeError, ValueError):
+            print("[Pipe] output closed, stopping", file=sys.stderr)
+            self._run.clear()
+
+    def close(self) -> None:
+        try:
+            self.stream.flush()
+        except Exception:
+            pass
+        if self._stdout is not None:
+            sys.stdout = self._stdout
+            self._stdout = None
@@ -0,0 +1,14 @@
+from typing import Protocol
+import numpy as np
+
+class Processor(Protocol):
+    """
+    Block effect (insert). Buffers are float32, shape (frames,) or (frames, channels).
+    """
+    def process(self, x: np.ndarray, sr: int) -> np.ndarray:
+        """Process one block; may work in place on `x` and return it."""
+        ...
+
+    def reset(self) -> None:
+        """Clear internal state (delay lines, filter memories)."""
+        ...
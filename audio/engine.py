@@ -1,7 +1,7 @@
 # audio/engine.py
-import sounddevice as sd
 import numpy as np
 import threading
+import time
 import wave, queue
 from typing import Optional
 
@@ -9,17 +9,54 @@ from routing.bus import EventBus
 from audio.dsp import soft_clip
 from audio.meter import AudioMeter
 from audio.mixer import Mixer
+from audio.backends import AudioBackend, SoundDeviceBackend
+from audio.ring import BlockRing
+from audio.rtaudit import RTAudit
+from audio.latency import LatencyMonitor
+from audio.loudness import LoudnessMeter
+from audio.spectrum import SpectrumAnalyzer
+from audio.stems import StemRecorder
 
 
 class AudioEngine:
     def __init__(self, mixer: Mixer, bus: EventBus, sr=44100, blocksize=256, channels=1,
                  pre_gain=0.3, limiter_drive=1.3, meter_period=1.0,
-                 record_to: Optional[str] = None):
+                 record_to: Optional[str] = None, backend: Optional[AudioBackend] = None,
+                 render_ahead: int = 0, rt_audit: bool = False, quantum: Optional[int] = None,
+                 measure_latency: bool = False, loudness: bool = False, spectrum: bool = False,
+                 record_stems: Optional[str] = None):
+        """
+        quantum: frames per internal processing block (default: blocksize; a power
+        of two such as 128 is best). Mixer, instruments and inserts always see this
+        size: an output FIFO cuts and joins quanta to whatever frame count the
+        device asks for, so blocksize (device latency) can be tuned, or left
+        variable (blocksize=0), independently.
+        render_ahead: number of blocks a worker thread keeps rendered ahead of the
+        device (0: render inside the audio callback). The callback then only copies
+        a block out, which absorbs GIL stalls and GC pauses; live events are delayed
+        by at most render_ahead blocks (see `ahead_latency`).
+        rt_audit: debug mode recording allocations, slow lock acquisitions, prints
+        and GC passes during block processing, per component (see `rt_report`).
+        measure_latency: timestamp bus events and measure note-on to sound latency
+        (queue wait, block wait, device latency; see `latency_report`).
+        loudness: LUFS / true-peak metering of the output (`loudness_meter`), on its
+        own thread; the callback only copies each block into its ring.
+        spectrum: live spectrum of the output (`spectrum`, a SpectrumAnalyzer), same tap.
+        record_stems: also record each mixer track to its own WAV file, e.g.
+        "take1_track{channel:02d}.wav" (see StemRecorder; `stems.report()`).
+        """
         self.mixer = mixer
         self.bus = bus
         self.sr = int(sr)
         self.blocksize = int(blocksize)
         self.channels = int(channels)
+        self.quantum = int(quantum) if quantum else (self.blocksize or 128)
+        if self.quantum <= 0:
+            raise ValueError(f"quantum must be positive, got {self.quantum}.")
+
+        # output FIFO: the current quantum, handed out from _fifo_pos on
+        self._fifo = np.zeros((self.quantum, self.channels), dtype=np.float32)
+        self._fifo_pos = self.quantum
 
         # processing
         self.pre_gain = float(pre_gain)
@@ -29,6 +66,12 @@ class AudioEngine:
         self.meter = AudioMeter(window_sec=meter_period)
         self._meter_period = float(meter_period)
         self._meter_thread: Optional[threading.Thread] = None
+        self.loudness_meter: Optional[LoudnessMeter] = None
+        if loudness:
+            self.loudness_meter = LoudnessMeter(self.sr, self.channels, self.quantum)
+        self.spectrum: Optional[SpectrumAnalyzer] = None
+        if spectrum:
+            self.spectrum = SpectrumAnalyzer(self.sr, self.quantum, self.channels)
 
         # coordinated shutdown
         self._stop_evt = threading.Event()
@@ -39,49 +82,99 @@ class AudioEngine:
         self._rec_run = False
         self._rec_thread: Optional[threading.Thread] = None
         self._wav: Optional[wave.Wave_write] = None
+        self.stems: Optional[StemRecorder] = None
+        if record_stems:
+            self.stems = StemRecorder(record_stems, self.sr, self.quantum)
+
+        # render-ahead: worker thread -> ring -> callback
+        self.render_ahead = max(0, int(render_ahead))
+        self._ring: Optional[BlockRing] = None
+        if self.render_ahead:
+            per_block = -(-max(self.blocksize, self.quantum) // self.quantum)
+            self._ring = BlockRing(self.render_ahead * per_block, (self.quantum, self.channels))
+        self._space = threading.Event()      # set by the callback when a slot frees up
+        self._ahead_thread: Optional[threading.Thread] = None
+        self.underruns = 0
+
+        # event-to-sound latency; frames rendered / handed to the backend so far
+        self.latency: Optional[LatencyMonitor] = None
+        if measure_latency:
+            self.latency = LatencyMonitor()
+            self.bus.timestamps = True
+            self.mixer.add_tap(self.latency.track_tap)
+        self._rendered = 0
+        self._emitted = 0
 
-        # audio stream
-        self.stream = sd.OutputStream(
-            channels=self.channels,
-            samplerate=self.sr,
-            blocksize=self.blocksize,
-            callback=self._cb,
-            latency='low'
-        )
+        # real-time safety audit (debug)
+        self.audit: Optional[RTAudit] = RTAudit() if rt_audit else None
+
+        # audio output: the device by default, or a null/file/pipe backend
+        self.backend = backend if backend is not None else SoundDeviceBackend(latency='low')
+        self.backend.open(self._cb, self.sr, self.blocksize, self.channels)
 
     ###########################################################################
     ##                              LIFECYCLE                                ##
     ###########################################################################
+    @property
+    def ahead_latency(self) -> float:
+        """Worst-case latency added by render-ahead, in seconds."""
+        return 0.0 if self._ring is None else self._ring.slots * self.quantum / float(self.sr)
+
+    def rt_report(self) -> Optional[dict]:
+        """RT audit results (see RTAudit.report), or None when the audit is off."""
+        return self.audit.report() if self.audit is not None else None
+
+    def latency_report(self) -> Optional[dict]:
+        """Latency percentiles (see LatencyMonitor.report), or None when not measured."""
+        return self.latency.report() if self.latency is not None else None
+
     def start(self):
         self._stop_evt.clear()
-        self.stream.start()
+        self._fifo_pos = self.quantum
+        self._rendered = self._emitted = 0
+        if self.latency is not None:
+            self.latency.drop_pending()
+        if self.audit is not None:
+            self.audit.install(self)    # hooks the tracks present now
 
-        # meter thread (non-daemon: we join it)
-        self._meter_thread = threading.Thread(target=self._meter_logger, name="AudioMeterThread")
-        self._meter_thread.start()
+        if self.loudness_meter is not None:
+            self.loudness_meter.start()
+        if self.spectrum is not None:
+            self.spectrum.start()
 
-        # recording
+        # recording (first, so that blocks rendered ahead are recorded too)
         if self._record_path:
             self._start_recording()
+        if self.stems is not None:
+            self.stems.start(self.mixer)
+
+        if self._ring is not None:
+            # fill the ring before the device asks for its first block
+            self._ring.clear()
+            while (view := self._ring.write_view()) is not None:
+                self._write_out(view, self._process_block(self.quantum))
+                self._ring.commit_write()
+            self._ahead_thread = threading.Thread(target=self._render_ahead, name="RenderAheadThread",
+                                                  daemon=True)
+            self._ahead_thread.start()
+        self.backend.start()
+
+        # meter thread (non-daemon: we join it)
+        self._meter_thread = threading.Thread(target=self._meter_logger, name="AudioMeterThread")
+        self._meter_thread.start()
 
     def stop(self):
         # tell threads to stop
         self._stop_evt.set()
 
         # stop audio first to stop callbacks quickly
-        # abort() is immediate; stop() drains—abort helps kill callback loop promptly
-        try:
-            self.stream.abort()
-        except Exception:
-            pass
-        try:
-            self.stream.stop()
-        except Exception:
-            pass
-        try:
-            self.stream.close()
-        except Exception:
-            pass
+        self.backend.stop()
+        self.backend.close()
+
+        if self._ahead_thread:
+            self._space.set()
+            self._ahead_thread.join(timeout=2.0)
+            self._ahead_thread = None
 
         # join meter
         if self._meter_thread:
@@ -90,9 +183,18 @@ class AudioEngine:
                 print("[Engine] WARNING: meter thread still alive after join()")
             self._meter_thread = None
 
+        if self.loudness_meter is not None:
+            self.loudness_meter.stop()
+        if self.spectrum is not None:
+            self.spectrum.stop()
+
         # stop recording
         if self._record_path:
             self._stop_recording()
+        if self.stems is not None:
+            self.stems.stop()
+        if self.audit is not None:
+            self.audit.uninstall()
         print("[Engine] stop() called")
 
 
@@ -106,11 +208,79 @@ class AudioEngine:
             outdata.fill(0)
             return
 
+        t_cb = time.perf_counter()
+        # hand out `frames` from the FIFO, processing (or, rendering ahead,
+        # popping) one quantum each time it runs empty
+        q = self.quantum
+        pos = 0
+        while pos < frames:
+            if self._fifo_pos >= q and not self._refill():
+                outdata[pos:] = 0
+                self.underruns += 1
+                break
+            n = min(frames - pos, q - self._fifo_pos)
+            outdata[pos:pos + n] = self._fifo[self._fifo_pos:self._fifo_pos + n]
+            self._fifo_pos += n
+            pos += n
+        if self.latency is not None:
+            self.latency.output(self._emitted, pos, t_cb, time_info, self.sr)
+        self._emitted += pos
+        if self._ring is not None:
+            self._space.set()
+
+    def _refill(self) -> bool:
+        """Next quantum into the FIFO; False on a render-ahead underrun."""
+        if self._ring is None:
+            self._write_out(self._fifo, self._process_block(self.quantum))
+        elif not self._ring.pop_into(self._fifo):
+            return False
+        self._fifo_pos = 0
+        return True
+
+    def _render_ahead(self):
+        period = self.quantum / float(self.sr)
+        ring = self._ring
+        while not self._stop_evt.is_set():
+            view = ring.write_view()
+            if view is None:
+                # clear before re-checking: a slot freed in between leaves the event set
+                self._space.clear()
+                if ring.full():
+                    self._space.wait(timeout=period)
+                continue
+            self._write_out(view, self._process_block(self.quantum))
+            ring.commit_write()
+
+    def _write_out(self, outdata, mix_lim):
+        if self.channels == 1:
+            outdata[:, 0] = mix_lim
+            if outdata.shape[1] > 1:
+                outdata[:, 1] = mix_lim
+        else:
+            outdata[:, :2] = mix_lim[:, :2]
+
+    def _process_block(self, frames):
+        """Events, mix, gain, limiter, meter and recording for one block; returns the output."""
+        if self.audit is None:
+            return self._render_block(frames)
+        self.audit.begin_block()
+        try:
+            return self._render_block(frames)
+        finally:
+            self.audit.end_block()
+
+    def _render_block(self, frames):
         # route events to mixer
-        self.mixer.route_events(self.bus.drain())
+        if self.latency is None:
+            self.mixer.route_events(self.bus.drain())
+        else:
+            batch, times = self.bus.drain_timed()
+            self.latency.drained(batch, times, self._rendered)
+            self.mixer.route_events(batch)
 
         # render
         mix = self.mixer.render(frames, self.sr, channels=self.channels).astype(np.float32)
+        self._rendered += frames
 
         # pre-gain
         if self.pre_gain != 1.0:
@@ -130,14 +300,10 @@ class AudioEngine:
         limited = bool(np.any(np.abs(mix_lim - mix) > 1e-7))
         self.meter.update(pre_peak=pre_peak, post_peak=post_peak, block_rms=block_rms,
                           limited=limited, frames=frames)
-
-        # write to device
-        if self.channels == 1:
-            outdata[:, 0] = mix_lim
-            if outdata.shape[1] > 1:
-                outdata[:, 1] = mix_lim
-        else:
-            outdata[:, :2] = mix_lim[:, :2]
+        if self.loudness_meter is not None:
+            self.loudness_meter.push(mix_lim)
+        if self.spectrum is not None:
+            self.spectrum.push(mix_lim)
 
         # enqueue for recording (non-blocking)
         if self._record_path and self._rec_run and not self._stop_evt.is_set() :
@@ -152,6 +318,7 @@ class AudioEngine:
             except queue.Full:
                 # drop; never block audio
                 pass
+        return mix_lim
 
     ###########################################################################
     ##                           METERING THREAD                             ##
@@ -172,6 +339,10 @@ class AudioEngine:
             print(f"[Audio] peak(pre/post): {snap['peak_pre_db']:+6.1f} dBFS / "
                   f"{snap['peak_post_db']:+6.1f} dBFS | rms: {snap['rms_db']:+6.1f} dBFS | "
                   f"frames:{snap['frames']:5d} | blocks_limited:{snap['limited_blocks']:2d} {bar}{lim}")
+            if self.loudness_meter is not None:
+                ld = self.loudness_meter.snapshot_and_reset()
+                print(f"[Loudness] M: {ld['momentary_lufs']:+6.1f} LUFS | S: {ld['short_term_lufs']:+6.1f} LUFS | "
+                      f"I: {ld['integrated_lufs']:+6.1f} LUFS | TP: {ld['true_peak_dbtp']:+6.1f} dBTP")
 
     @staticmethod
     def _bar(db, floor=-60.0, ceil=0.0, width=20):
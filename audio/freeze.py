@@ -0,0 +1,130 @@
+from __future__ import annotations
+from enum import Enum, auto
+from typing import Optional
+import numpy as np
+
+
+class FreezeState(Enum):
+    ARMED = auto()       # waiting for the first note of the pattern
+    CAPTURING = auto()   # rendering live: one warm-up cycle, then one captured cycle
+    FROZEN = auto()      # playing back from the loop buffer
+
+
+class TrackFreeze:
+    """
+    Loop buffer for a track driven by a looping sequencer.
+
+    The track keeps rendering live for two pattern cycles: the first one lets the
+    release tails of the previous cycle build up, the second one is copied into the
+    buffer. The captured cycle therefore already contains the tails wrapping in from
+    the cycle before, so it loops seamlessly. Afterwards the buffer is played back,
+    resynchronised on the sequencer's notes to follow the clock.
+
+    The sequencer must provide `cycle_ticks(ppq)`, `cycle_position(ppq)` and
+    `pattern_version` (see StepSequencer). The tempo is read from `clock` (a
+    sequencing.Clock) when given, else fixed to `bpm`; with a clock, the loop
+    is stale as soon as the tempo changes (`tempo_changed`).
+    """
+    def __init__(self, sequencer, *, bpm: Optional[float] = None, clock=None, ppq: int = 24,
+                 sr: int = 44100, resync_tol: float = 0.010):
+        if bpm is None and clock is None:
+            raise ValueError("TrackFreeze needs the tempo: bpm= or clock=.")
+        self.sequencer = sequencer
+        self.clock = clock
+        self.bpm = float(clock.bpm if clock is not None else bpm)
+        self.ppq = int(ppq)
+        self.sr = int(sr)
+        self.frames_per_tick = 60.0 / self.bpm / self.ppq * self.sr
+        self.cycle_frames = max(1, int(round(sequencer.cycle_ticks(self.ppq) * self.frames_per_tick)))
+        self.resync_tol = int(resync_tol * self.sr)   # max playhead drift before snapping (frames)
+
+        self.buf = np.zeros(self.cycle_frames, dtype=np.float32)
+        self._scratch = np.zeros(0, dtype=np.float32)
+        self.arm()
+
+    def arm(self) -> None:
+        self.state = FreezeState.ARMED
+        self._version = self.sequencer.pattern_version
+        self._pos = 0      # playhead within the cycle (frames)
+        self._count = 0    # frames rendered since the first note
+
+    @property
+    def frozen(self) -> bool:
+        return self.state == FreezeState.FROZEN
+
+    def pattern_changed(self) -> bool:
+        return self.sequencer.pattern_version != self._version
+
+    def tempo_changed(self) -> bool:
+        """The clock no longer runs at the tempo the loop was sized for."""
+        return self.clock is not None and abs(self.clock.bpm - self.bpm) > 1e-6 * self.bpm
+
+    ###########################################################################
+    ##                              EVENTS                                   ##
+    ###########################################################################
+
+    def on_note_on(self) -> None:
+        """
+        Called when a NoteOn reaches the track, before the block it starts in is
+        rendered. Starts the capture, or resyncs the playhead on the sequencer step.
+        """
+        target = int(round(self.sequencer.cycle_position(self.ppq) * self.frames_per_tick))
+        target %= self.cycle_frames
+
+        if self.state == FreezeState.ARMED:
+            self._pos = target
+            self._count = 0
+            self.state = FreezeState.CAPTURING
+        elif self.state == FreezeState.FROZEN:
+            drift = (target - self._pos) % self.cycle_frames
+            drift = min(drift, self.cycle_frames - drift)
+            if drift > self.resync_tol:
+                self._pos = target
+
+    ###########################################################################
+    ##                             RENDERING                                 ##
+    ###########################################################################
+
+    def capture(self, block: np.ndarray) -> None:
+        """Feed a block rendered live; the second cycle after the first note is kept."""
+        if self.state != FreezeState.CAPTURING:
+            return
+        n = block.shape[0]
+        C = self.cycle_frames
+        skip = max(0, C - self._count)            # still in the warm-up cycle
+        end = min(n, 2 * C - self._count)
+        if end > skip:
+            self._write((self._pos + skip) % C, block[skip:end])
+
+        self._pos = (self._pos + n) % C
+        self._count += n
+        if self._count >= 2 * C:
+            self.state = FreezeState.FROZEN
+
+    def play(self, frames: int) -> np.ndarray:
+        """Next `frames` samples of the loop (a view into the buffer when possible)."""
+        C = self.cycle_frames
+        start = self._pos
+        self._pos = (start + frames) % C
+        if start + frames <= C:
+            return self.buf[start:start + frames]
+
+        if self._scratch.shape[0] != frames:
+            self._scratch = np.zeros(frames, dtype=np.float32)
+        out = self._scratch
+        i = 0
+        while i < frames:
+            n = min(frames - i, C - start)
+            out[i:i + n] = self.buf[start:start + n]
+            i += n
+            start = 0
+        return out
+
+    def _write(self, start: int, data: np.ndarray) -> None:
+        C = self.cycle_frames
+        i = 0
+        while i < data.shape[0]:
+            n = min(data.shape[0] - i, C - start)
+            self.buf[start:start + n] = data[i:i + n]
+            i += n
+            start = 0
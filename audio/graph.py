@@ -0,0 +1,356 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import threading
+
+from audio.base import Processor
+from audio.mixer import Mixer, _SILENT
+
+MASTER = "master"
+
+
+@dataclass
+class Node:
+    name: str
+    channel: Optional[int] = None           # source node: Mixer track channel
+    processor: Optional[Processor] = None   # insert applied after summing the inputs
+    inputs: List[Tuple[str, float]] = field(default_factory=list)   # (node name, gain)
+
+    @property
+    def is_source(self) -> bool:
+        return self.channel is not None
+
+
+@dataclass(frozen=True)
+class SourceOp:
+    channel: int
+    out: int            # buffer index
+
+@dataclass(frozen=True)
+class CopyOp:           # dst = gain * src (first input of a bus)
+    dst: int
+    src: int
+    gain: float
+
+@dataclass(frozen=True)
+class AddOp:            # dst += gain * src
+    dst: int
+    src: int
+    gain: float
+
+@dataclass(frozen=True)
+class ScaleOp:          # buf *= gain (bus taking over its input's buffer)
+    buf: int
+    gain: float
+
+@dataclass(frozen=True)
+class ClearOp:          # bus without inputs
+    buf: int
+
+@dataclass(frozen=True)
+class ProcessOp:
+    buf: int
+    processor: Processor
+
+
+class CompiledGraph:
+    """
+    Topologically ordered schedule over a small pool of scratch buffers.
+
+    As soon as a node is complete it is accumulated into each of its consumers,
+    then its buffer goes back to the pool (or is handed over to its last consumer
+    as-is), so buffer lifetimes follow liveness and chains of inserts run in place.
+    The master is copied into an output buffer owned by the schedule, returned by
+    every render (valid until the next one).
+    """
+    def __init__(self, schedule: List[object], n_buffers: int, master: int, order: List[str]):
+        self.schedule = schedule
+        self.n_buffers = n_buffers
+        self.master = master
+        self.order = order
+        self._pool = np.zeros((0, 0, 0), dtype=np.float32)
+        self._scratch = np.zeros((0, 0), dtype=np.float32)
+        self._out = np.zeros((0, 0), dtype=np.float32)
+
+    def _buffers(self, frames: int, channels: int) -> np.ndarray:
+        if self._pool.shape != (self.n_buffers, frames, channels):
+            self._pool = np.zeros((self.n_buffers, frames, channels), dtype=np.float32)
+            self._scratch = np.zeros((frames, channels), dtype=np.float32)
+            self._out = np.zeros(frames if channels == 1 else (frames, channels), dtype=np.float32)
+        return self._pool
+
+    def render(self, mixer: Mixer, frames: int, sr: int, channels: int) -> np.ndarray:
+        tracks, any_solo = mixer.begin_block()
+        tracks = dict(tracks)
+        taps = mixer._taps
+        meters = mixer.meters
+        bufs = self._buffers(frames, channels)
+        tmp = self._scratch
+
+        for op in self.schedule:
+            if isinstance(op, AddOp):
+                if op.gain == 1.0:
+                    bufs[op.dst] += bufs[op.src]
+                else:
+                    np.multiply(bufs[op.src], op.gain, out=tmp)
+                    bufs[op.dst] += tmp
+            elif isinstance(op, SourceOp):
+                out = bufs[op.out]
+                tr = tracks.get(op.channel)
+                if tr is None or tr.mute or (any_solo and not tr.solo):
+                    out.fill(0.0)
+                    if tr is not None:
+                        voices = tr.instrument.num_active_voices()
+                        meters.update(op.channel, _SILENT, tr.gain, voices)
+                    continue
+                buf = mixer.render_track(tr, frames, sr)
+                meters.update(op.channel, buf, tr.gain, tr.instrument.num_active_voices())
+                for tap in taps:
+                    tap(op.channel, tr, buf)
+                if channels == 1:
+                    np.multiply(buf, tr.gain, out=out[:, 0])
+                else:
+                    gL, gR = Mixer._pan_gains(tr.pan)
+                    np.multiply(buf, tr.gain * gL, out=out[:, 0])
+                    np.multiply(buf, tr.gain * gR, out=out[:, 1])
+            elif isinstance(op, CopyOp):
+                np.multiply(bufs[op.src], op.gain, out=bufs[op.dst])
+            elif isinstance(op, ScaleOp):
+                bufs[op.buf] *= op.gain
+            elif isinstance(op, ClearOp):
+                bufs[op.buf].fill(0.0)
+            elif isinstance(op, ProcessOp):
+                out = bufs[op.buf]
+                res = op.processor.process(out, sr)
+                if res is not out:
+                    out[:] = res
+
+        mixer.end_block()
+        out = self._out
+        np.copyto(out, bufs[self.master][:, 0] if channels == 1 else bufs[self.master])
+        return out
+
+
+class AudioGraph:
+    """
+    DAG of Mixer tracks (sources), inserts, group buses, send/return buses and master.
+
+    Every non-source node sums its weighted inputs, then runs its optional insert:
+    a group bus is a node fed by several tracks, a send is a connection with a gain
+    to a return node holding the effect. Mutations recompile the schedule in the
+    calling (control) thread; the audio thread only reads the published
+    CompiledGraph, swapped in with a single reference assignment.
+
+    Exposes route_events/render, snapshot_tracks, the Mixer taps, track meters and
+    block clock (run and updated for every source), so it can be given to
+    AudioEngine in place of the Mixer.
+    """
+    def __init__(self, mixer: Mixer):
+        self.mixer = mixer
+        self._nodes: Dict[str, Node] = {MASTER: Node(MASTER)}
+        self._lock = threading.Lock()   # serializes graph edits / compilation (never taken by render)
+        self._compiled: CompiledGraph = self._compile()
+
+
+    ###########################################################################
+    ##                           GRAPH EDITING                               ##
+    ###########################################################################
+
+    def add_source(self, name: str, channel: int) -> None:
+        self._edit(lambda: self._add(Node(name, channel=int(channel))))
+
+    def add_bus(self, name: str, processor: Optional[Processor] = None) -> None:
+        """Group, send/return or insert node: sums its inputs, then applies `processor`."""
+        self._edit(lambda: self._add(Node(name, processor=processor)))
+
+    def set_processor(self, name: str, processor: Optional[Processor]) -> None:
+        def edit():
+            node = self._node(name)
+            if node.is_source:
+                raise ValueError(f"Source node '{name}' cannot hold a processor.")
+            node.processor = processor
+        self._edit(edit)
+
+    def remove_node(self, name: str) -> None:
+        if name == MASTER:
+            raise ValueError("The master node cannot be removed.")
+        def edit():
+            self._nodes.pop(name, None)
+            for node in self._nodes.values():
+                node.inputs = [(src, g) for src, g in node.inputs if src != name]
+        self._edit(edit)
+
+    def connect(self, src: str, dst: str, gain: float = 1.0) -> None:
+        """Route `src` into `dst` (a send when `gain` < 1). Reconnecting updates the gain."""
+        def edit():
+            self._node(src)
+            node = self._node(dst)
+            if node.is_source:
+                raise ValueError(f"Source node '{dst}' has no inputs.")
+            node.inputs = [(s, g) for s, g in node.inputs if s != src] + [(src, float(gain))]
+        self._edit(edit)
+
+    def disconnect(self, src: str, dst: str) -> None:
+        def edit():
+            node = self._node(dst)
+            node.inputs = [(s, g) for s, g in node.inputs if s != src]
+        self._edit(edit)
+
+    @property
+    def compiled(self) -> CompiledGraph:
+        return self._compiled
+
+    def _add(self, node: Node) -> None:
+        if node.name in self._nodes:
+            raise ValueError(f"Node '{node.name}' already exists.")
+        self._nodes[node.name] = node
+
+    def _node(self, name: str) -> Node:
+        try:
+            return self._nodes[name]
+        except KeyError:
+            raise KeyError(f"Unknown node '{name}'.") from None
+
+    def _edit(self, fn) -> None:
+        # edit a copy, so a failing edit (e.g. a cycle) leaves the graph untouched
+        with self._lock:
+            backup = {k: Node(n.name, n.channel, n.processor, list(n.inputs)) for k, n in self._nodes.items()}
+            try:
+                fn()
+                compiled = self._compile()
+            except Exception:
+                self._nodes = backup
+                raise
+            _, frames, channels = self._compiled._pool.shape
+            if frames:
+                compiled._buffers(frames, channels)   # keep allocation off the audio thread
+            self._compiled = compiled   # atomic swap, picked up by the next block
+
+
+    ###########################################################################
+    ##                            COMPILATION                                ##
+    ###########################################################################
+
+    def _compile(self) -> CompiledGraph:
+        order = self._topological_order()
+        consumers: Dict[str, List[Tuple[str, float]]] = {name: [] for name in order}
+        for name in order:
+            for src, g in self._nodes[name].inputs:
+                consumers[src].append((name, g))
+
+        free: List[int] = []
+        n_buffers = 0
+        acc: Dict[str, int] = {}       # node -> buffer its inputs are summed into
+        schedule: List[object] = []
+
+        def alloc() -> int:
+            nonlocal n_buffers
+            if free:
+                return free.pop()
+            n_buffers += 1
+            return n_buffers - 1
+
+        master = 0
+        for name in order:
+            node = self._nodes[name]
+            if node.is_source:
+                buf = alloc()
+                schedule.append(SourceOp(node.channel, buf))
+            else:
+                buf = acc.pop(name, None)
+                if buf is None:
+                    buf = alloc()
+                    schedule.append(ClearOp(buf))
+                if node.processor is not None:
+                    schedule.append(ProcessOp(buf, node.processor))
+            if name == MASTER:
+                master = buf
+                continue
+
+            # push the finished output into every consumer
+            outs = consumers[name]
+            handed_over = False
+            for k, (dst, g) in enumerate(outs):
+                if dst in acc:
+                    schedule.append(AddOp(acc[dst], buf, g))
+                elif k == len(outs) - 1:
+                    acc[dst] = buf          # last reader: hand the buffer over
+                    handed_over = True
+                    if g != 1.0:
+                        schedule.append(ScaleOp(buf, g))
+                else:
+                    acc[dst] = alloc()
+                    schedule.append(CopyOp(acc[dst], buf, g))
+            if not handed_over:
+                free.append(buf)
+
+        return CompiledGraph(schedule, n_buffers, master, order)
+
+    def _topological_order(self) -> List[str]:
+        """
+        Kahn's algorithm over the nodes feeding master; raises on cycles.
+        Ready nodes are taken depth-first, so buses complete (and free their
+        inputs) as early as possible.
+        """
+        live = set()
+        stack = [MASTER]
+        while stack:
+            name = stack.pop()
+            if name in live:
+                continue
+            live.add(name)
+            stack.extend(src for src, _ in self._nodes[name].inputs)
+
+        consumers: Dict[str, List[str]] = {name: [] for name in live}
+        indeg = {name: 0 for name in live}
+        for name in live:
+            for src, _ in self._nodes[name].inputs:
+                consumers[src].append(name)
+                indeg[name] += 1
+
+        ready = sorted(name for name in live if indeg[name] == 0)
+        order: List[str] = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dst in consumers[name]:
+                indeg[dst] -= 1
+                if indeg[dst] == 0:
+                    ready.append(dst)
+        if len(order) != len(live):
+            raise ValueError("Audio graph contains a cycle.")
+        return order
+
+
+    ###########################################################################
+    ##                      EVENT ROUTING / RENDERING                        ##
+    ###########################################################################
+
+    def route_event(self, e: object) -> None:
+        self.mixer.route_event(e)
+
+    def snapshot_tracks(self):
+        return self.mixer.snapshot_tracks()
+
+    @property
+    def meters(self):
+        return self.mixer.meters
+
+    @property
+    def blocks(self) -> int:
+        return self.mixer.blocks
+
+    def add_tap(self, tap) -> None:
+        self.mixer.add_tap(tap)
+
+    def remove_tap(self, tap) -> None:
+        self.mixer.remove_tap(tap)
+
+    def route_events(self, events) -> None:
+        self.mixer.route_events(events)
+
+    def render(self, frames: int, sr: int, channels: int = 1) -> np.ndarray:
+        if channels not in (1, 2):
+            raise ValueError("Only mono or stereo mixing supported currently.")
+        return self._compiled.render(self.mixer, frames, sr, channels)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Dict, List
+import numpy as np
+
+from midi.messages import NOTE_ON
+
+# stages of a note-on, from the moment it is posted to the moment it is heard
+STAGES = ("queue", "block", "device", "total")
+
+
+class LatencyMonitor:
+    """
+    Event-to-sound latency of note-ons, split in three stages:
+
+    - queue:  posted on the bus (timestamp of the MIDI listener or sequencer post)
+              until drained by the engine,
+    - block:  drained until the first non-silent sample of its track is handed to
+              the backend (rendering, render-ahead, FIFO position in the buffer),
+    - device: backend buffer to DAC, from the callback's time_info
+              (outputBufferDacTime - currentTime); unknown (None in the
+              report) with backends giving no time_info, such as the thread
+              backends,
+
+    and their sum ("total", without the device stage when it is unknown). The onset is the first sample of the note's track
+    above `threshold` from the block its note-on was routed in: with other notes
+    already sounding on the track, that is the start of the block.
+
+    The engine calls `drained` from the rendering thread, where `track_tap` runs as
+    a Mixer tap, and `output` from the callback; the latest
+    `history` measurements are kept in preallocated arrays for `report`.
+    """
+    def __init__(self, history: int = 4096, threshold: float = 1e-4, timeout: float = 2.0):
+        self.threshold = float(threshold)
+        self.timeout = float(timeout)
+        self.samples = np.zeros((len(STAGES), max(1, int(history))))
+        self.count = 0              # measurements taken
+        self.lost = 0               # note-ons never heard within `timeout` (muted track, no track)
+        self._waiting: Dict[int, List[tuple]] = {}      # channel -> [(t_post, t_drain)]
+        self._frame0 = 0                                # absolute frame of the block being rendered
+        self._scheduled: deque = deque()                # (frame, t_post, t_drain), in frame order
+
+    ###########################################################################
+    ##                          RENDERING THREAD                             ##
+    ###########################################################################
+
+    def drained(self, batch: np.ndarray, times: List[float], frame0: int) -> None:
+        """Note-ons of a drained batch (with their post times), routed at absolute frame `frame0`."""
+        now = time.perf_counter()
+        self._frame0 = frame0
+        for ch, wait in self._waiting.items():
+            if wait and now - wait[0][1] > self.timeout:
+                self.lost += len(wait)
+                wait.clear()
+        if batch.shape[0] == 0:
+            return
+        for kind, ch, t in zip(batch["type"].tolist(), batch["channel"].tolist(), times):
+            if kind == NOTE_ON:
+                self._waiting.setdefault(ch, []).append((t, now))
+
+    def track_tap(self, channel: int, track, buf: np.ndarray) -> None:
+        """Mixer tap: schedule the waiting note-ons of `channel` at its first non-silent sample."""
+        wait = self._waiting.get(channel)
+        if not wait:
+            return
+        loud = np.abs(buf) > self.threshold
+        i = int(np.argmax(loud))
+        if not loud[i]:
+            return
+        frame = self._frame0 + i
+        for t_post, t_drain in wait:
+            self._scheduled.append((frame, t_post, t_drain))
+        wait.clear()
+
+    ###########################################################################
+    ##                              CALLBACK                                 ##
+    ###########################################################################
+
+    def output(self, frame0: int, frames: int, t_cb: float, time_info, sr: int) -> None:
+        """Frames [frame0, frame0 + frames) went to the backend in a callback started at `t_cb`."""
+        sched = self._scheduled
+        if not sched or sched[0][0] >= frame0 + frames:
+            return
+        device = np.nan            # unknown
+        if time_info is not None:
+            dac = getattr(time_info, "outputBufferDacTime", 0.0)
+            now = getattr(time_info, "currentTime", 0.0)
+            if dac and now:
+                device = max(0.0, dac - now)
+        while sched and sched[0][0] < frame0 + frames:
+            frame, t_post, t_drain = sched.popleft()
+            queue_wait = t_drain - t_post
+            block_wait = max(0.0, t_cb + max(0, frame - frame0) / float(sr) - t_drain)
+            k = self.count % self.samples.shape[1]
+            total = queue_wait + block_wait + (0.0 if np.isnan(device) else device)
+            self.samples[:, k] = (queue_wait, block_wait, device, total)
+            self.count += 1
+
+    ###########################################################################
+    ##                               REPORT                                  ##
+    ###########################################################################
+
+    def reset(self) -> None:
+        self.count = 0
+        self.lost = 0
+
+    def drop_pending(self) -> None:
+        """Forget note-ons in flight (engine restart: frame counters start over)."""
+        self._waiting.clear()
+        self._scheduled.clear()
+
+    def report(self, percentiles=(50, 90, 99)) -> dict:
+        """Percentiles and max per stage in ms, over the latest measurements (None: unknown)."""
+        n = min(self.count, self.samples.shape[1])
+        out = {"events": self.count, "lost": self.lost}
+        data = self.samples[:, :n].copy() * 1e3
+        for name, row in zip(STAGES, data):
+            row = row[~np.isnan(row)]
+            if row.size == 0:
+                out[f"{name}_ms"] = None
+                continue
+            stats = {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(row, percentiles))}
+            stats["max"] = float(row.max())
+            out[f"{name}_ms"] = stats
+        return out
+
+    def format_report(self) -> str:
+        r = self.report()
+        lines = [f"Latency over {min(r['events'], self.samples.shape[1])} note-ons ({r['lost']} lost)"]
+        for name in STAGES:
+            st = r[f"{name}_ms"]
+            if st is None:
+                if r["events"]:
+                    lines.append(f"  {name:<7}  unknown (no time_info from the backend)")
+                continue
+            lines.append(f"  {name:<7}" + "".join(f"  {k} {v:7.2f} ms" for k, v in st.items()))
+        return "\n".join(lines)
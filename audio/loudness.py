@@ -0,0 +1,227 @@
+from __future__ import annotations
+import math
+import threading
+from typing import List, Optional
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin, sosfilt
+
+from audio.meter import lin_to_dbfs, _EPS
+from audio.ring import BlockRing
+
+ABS_GATE_LUFS = -70.0
+REL_GATE_LU = -10.0
+HIST_STEP_LU = 0.1      # integration histogram: 0.1 LU bins above the absolute gate
+HIST_BINS = 800         # up to +10 LUFS (louder blocks go to the last bin)
+OVERSAMPLE = 4
+TP_TAPS = 48            # true-peak interpolator: 4 phases x 12 taps
+
+
+def energy_to_lufs(e: float) -> float:
+    return -0.691 + 10.0 * math.log10(max(_EPS, e))
+
+
+def k_weighting_sos(sr: int) -> np.ndarray:
+    """
+    ITU-R BS.1770 K-weighting at any rate: high shelf (head effect) then the RLB
+    high-pass, as two SOS rows. At 48 kHz this gives the coefficients of the standard.
+    """
+    # stage 1: high shelf, +4 dB above ~1.7 kHz
+    f0, G, Q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    K = math.tan(math.pi * f0 / sr)
+    Vh = 10.0 ** (G / 20.0)
+    Vb = Vh ** 0.4996667741545416
+    a0 = 1.0 + K / Q + K * K
+    shelf = [(Vh + Vb * K / Q + K * K) / a0, 2.0 * (K * K - Vh) / a0, (Vh - Vb * K / Q + K * K) / a0,
+             1.0, 2.0 * (K * K - 1.0) / a0, (1.0 - K / Q + K * K) / a0]
+    # stage 2: RLB high-pass at ~38 Hz
+    f0, Q = 38.13547087602444, 0.5003270373238773
+    K = math.tan(math.pi * f0 / sr)
+    a0 = 1.0 + K / Q + K * K
+    hp = [1.0, -2.0, 1.0, 1.0, 2.0 * (K * K - 1.0) / a0, (1.0 - K / Q + K * K) / a0]
+    return np.array([shelf, hp])
+
+
+class LoudnessMeter:
+    """
+    Streaming loudness (ITU-R BS.1770 / EBU R128) and true peak, computed off the
+    audio thread.
+
+    The audio thread only calls `push` (one copy into a preallocated BlockRing;
+    a full ring drops the block and counts it). A worker thread K-weights the
+    blocks with sosfilt, carrying the filter state, and accumulates 100 ms energy
+    steps from which it derives
+
+    - momentary loudness (400 ms) and short-term loudness (3 s), in LUFS,
+    - integrated loudness, gated at -70 LUFS absolute and -10 LU relative over
+      400 ms blocks with 75% overlap; the blocks are kept in a fixed histogram
+      (0.1 LU bins, block count and energy per bin), so its cost and memory do
+      not grow with the programme length,
+    - true peak: 4x polyphase oversampling of the unweighted signal, in dBTP.
+
+    `snapshot_and_reset` has the contract of AudioMeter's: current values plus the
+    maxima over the window since the last snapshot (integrated loudness covers the
+    whole programme, until `reset_integrated`).
+    """
+    def __init__(self, sr: int = 44100, channels: int = 1, blocksize: int = 256, slots: int = 64):
+        self.sr = int(sr)
+        self.channels = int(channels)
+        shape = (int(blocksize),) if self.channels == 1 else (int(blocksize), self.channels)
+        self.ring = BlockRing(slots, shape)
+        self.lock = threading.Lock()
+
+        # K-weighting, state carried across blocks: (sections, 2, channels)
+        self._sos = k_weighting_sos(self.sr)
+        self._zi = np.zeros((self._sos.shape[0], 2, self.channels))
+
+        # 100 ms energy steps (channel weights are 1 for mono / left / right)
+        self._step = max(1, self.sr // 10)
+        self._acc = 0.0
+        self._acc_n = 0
+        self._steps: List[float] = []           # last 30 steps (3 s)
+        self._hist_n = np.zeros(HIST_BINS, dtype=np.int64)     # 400 ms blocks per loudness bin
+        self._hist_e = np.zeros(HIST_BINS)                      # their summed energy
+
+        # true peak interpolator: phase p, tap j applied to x[n - 11 + j]
+        h = firwin(TP_TAPS, 1.0 / OVERSAMPLE) * OVERSAMPLE
+        taps = TP_TAPS // OVERSAMPLE
+        self._tp_h = np.array([[h[p + OVERSAMPLE * (taps - 1 - j)] for j in range(taps)]
+                               for p in range(OVERSAMPLE)])
+        self._tp_hist = np.zeros((taps - 1, self.channels))
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reset_integrated()
+        self._reset_window()
+
+    ###########################################################################
+    ##                            AUDIO THREAD                               ##
+    ###########################################################################
+
+    def push(self, block: np.ndarray) -> bool:
+        """Copy one block in (audio thread); False if the ring was full."""
+        return self.ring.push(block)
+
+    ###########################################################################
+    ##                               WORKER                                  ##
+    ###########################################################################
+
+    def start(self) -> None:
+        self.ring.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, name="LoudnessThread", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _worker(self) -> None:
+        # wake up when about a quarter of the ring is filled
+        nap = 0.25 * self.ring.slots * self.ring.buf.shape[1] / float(self.sr)
+        while not self._stop.is_set():
+            if not self.drain():
+                self._stop.wait(nap)
+        self.drain()
+
+    def drain(self) -> int:
+        """Process every block waiting in the ring; returns how many (worker side)."""
+        n = 0
+        while (view := self.ring.read_view()) is not None:
+            x = np.array(view, dtype=np.float64).reshape(view.shape[0], self.channels)
+            self.ring.commit_read()
+            self.process(x)
+            n += 1
+        return n
+
+    def process(self, x: np.ndarray) -> None:
+        """Measure a block (frames, channels) float64, in order."""
+        z, self._zi = sosfilt(self._sos, x, axis=0, zi=self._zi)
+        e = np.einsum("ij,ij->i", z, z)                 # weighted energy per frame
+        tp = self._true_peak(x)
+
+        with self.lock:
+            self.frames += x.shape[0]
+            self.tp_max = max(self.tp_max, tp)
+            i, n = 0, e.shape[0]
+            while i < n:
+                take = min(n - i, self._step - self._acc_n)
+                self._acc += float(e[i:i + take].sum())
+                self._acc_n += take
+                i += take
+                if self._acc_n == self._step:
+                    self._end_step(self._acc / self._step)
+                    self._acc, self._acc_n = 0.0, 0
+
+    def _end_step(self, energy: float) -> None:
+        steps = self._steps
+        steps.append(energy)
+        if len(steps) > 30:
+            del steps[0]
+        if len(steps) >= 4:
+            m = sum(steps[-4:]) / 4.0
+            self.momentary = energy_to_lufs(m)
+            self.m_max = max(self.m_max, self.momentary)
+            if self.momentary > ABS_GATE_LUFS:
+                k = min(HIST_BINS - 1, int((self.momentary - ABS_GATE_LUFS) / HIST_STEP_LU))
+                self._hist_n[k] += 1
+                self._hist_e[k] += m
+        if len(steps) == 30:
+            self.short_term = energy_to_lufs(sum(steps) / 30.0)
+            self.s_max = max(self.s_max, self.short_term)
+
+    def _true_peak(self, x: np.ndarray) -> float:
+        ext = np.concatenate([self._tp_hist, x], axis=0)
+        self._tp_hist = ext[-self._tp_hist.shape[0]:].copy()
+        w = sliding_window_view(ext, self._tp_h.shape[1], axis=0)  # (frames, channels, taps)
+        y = w @ self._tp_h.T                                       # (frames, channels, phases)
+        return float(np.max(np.abs(y))) if y.size else 0.0
+
+    ###########################################################################
+    ##                              SNAPSHOTS                                ##
+    ###########################################################################
+
+    def integrated(self) -> float:
+        """Gated integrated loudness of everything measured since reset_integrated."""
+        with self.lock:
+            n = self._hist_n.copy()
+            e = self._hist_e.copy()
+        floor = energy_to_lufs(0.0)
+        count = int(n.sum())          # blocks above the absolute gate
+        if count == 0:
+            return floor
+        rel = energy_to_lufs(float(e.sum()) / count) + REL_GATE_LU
+        # relative gate per bin (by its mean block energy): exact to the bin width
+        kept = e > n * 10.0 ** ((rel + 0.691) / 10.0)
+        count = int(n[kept].sum())
+        return energy_to_lufs(float(e[kept].sum()) / count) if count else floor
+
+    def reset_integrated(self) -> None:
+        with self.lock:
+            self._hist_n.fill(0)
+            self._hist_e.fill(0.0)
+            self.momentary = self.short_term = energy_to_lufs(0.0)
+
+    def _reset_window(self) -> None:
+        self.frames = 0
+        self.tp_max = 0.0
+        self.m_max = self.s_max = energy_to_lufs(0.0)
+
+    def snapshot_and_reset(self) -> dict:
+        integrated = self.integrated()
+        with self.lock:
+            snap = {
+                "momentary_lufs":      self.momentary,
+                "short_term_lufs":     self.short_term,
+                "integrated_lufs":     integrated,
+                "max_momentary_lufs":  self.m_max,
+                "max_short_term_lufs": self.s_max,
+                "true_peak_lin":       self.tp_max,
+                "true_peak_dbtp":      lin_to_dbfs(self.tp_max),
+                "frames":              self.frames,
+                "dropped_blocks":      self.ring.dropped,
+            }
+            self._reset_window()
+            return snap
@@ -1,11 +1,35 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Iterable, Tuple
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import inspect
 import numpy as np
 import threading
 
-# Events (same shape your bus posts)
-from midi.messages import NoteOn, NoteOff, CC
+# Events: batches as posted by the bus (see midi.messages)
+from midi.messages import (NOTE_ON, NOTE_OFF, CONTROL_CHANGE, PITCH_BEND,
+                           encode, to_batch)
+from audio.base import Processor
+from audio.freeze import TrackFreeze
+from audio.trackmeter import TrackMeterBank
+
+_SILENT = np.zeros(0, dtype=np.float32)
+
+
+def takes_midi_batches(instrument: object) -> bool:
+    """
+    True if `instrument.handle_events` is MidiInstrument's handle_events(batch);
+    a FrequencyInstrument's handle_events(batch, freqs, ...) does not qualify.
+    """
+    handle = getattr(instrument, "handle_events", None)
+    if handle is None:
+        return False
+    try:
+        params = inspect.signature(handle).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    required = [p for p in params if p.default is p.empty
+                and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    return len(required) == 1
 
 @dataclass
 class Track:
@@ -16,15 +40,31 @@ class Track:
     pan: float = 0.0         # -1 = left, 0 = center, +1 = right
     mute: bool = False
     solo: bool = False
+    freeze: Optional[TrackFreeze] = None   # set while the track is frozen (or capturing)
+    inserts: List[Processor] = field(default_factory=list)   # mono, pre-gain effects
+    batch_events: bool = field(init=False, repr=False)        # see takes_midi_batches
+
+    def __post_init__(self):
+        self.batch_events = takes_midi_batches(self.instrument)
 
 class Mixer:
     """
     Thread-safe mixer. Routes events by `channel` to tracks and renders a mixed buffer.
     Tracks are indexed by MIDI channel (int).
+
+    Taps, tap(channel, track, buf), see the mono pre-gain output of every
+    rendered track during `render` (on the audio thread: they must be cheap).
+
+    `meters` holds per-track post-gain peak / RMS and voice counts, updated by
+    every block rendered (here or by an AudioGraph, between `begin_block` and
+    `end_block`) and readable from any thread without the lock.
     """
     def __init__(self):
         self._tracks: Dict[int, Track] = {}
         self._lock = threading.Lock()
+        self._taps: Tuple[Callable[[int, Track, np.ndarray], None], ...] = ()
+        self.meters = TrackMeterBank()
+        self.blocks = 0         # blocks rendered so far, by either path (block clock for taps)
 
 
     ###########################################################################
@@ -45,6 +85,7 @@ class Mixer:
         with self._lock:
             if ch := self._tracks.get(int(channel)):
                 ch.gain = float(gain)
+                ch.freeze = None
 
     def set_pan(self, channel: int, pan: float) -> None:
         with self._lock:
@@ -61,33 +102,125 @@ class Mixer:
             if ch := self._tracks.get(int(channel)):
                 ch.solo = bool(solo)
 
-    
+    def set_inserts(self, channel: int, inserts: List[Processor]) -> None:
+        with self._lock:
+            if ch := self._tracks.get(int(channel)):
+                ch.inserts = list(inserts)
+
+
+    def add_tap(self, tap: Callable[[int, Track, np.ndarray], None]) -> None:
+        with self._lock:
+            self._taps = self._taps + (tap,)
+
+    def remove_tap(self, tap: Callable[[int, Track, np.ndarray], None]) -> None:
+        with self._lock:
+            self._taps = tuple(t for t in self._taps if t != tap)
+
+
+    ###########################################################################
+    ##                              FREEZE                                   ##
+    ###########################################################################
+
+    def freeze(self, channel: int, sequencer, *, bpm: Optional[float] = None, clock=None,
+               ppq: int = 24, sr: int = 44100) -> None:
+        """
+        Freeze a track driven by a looping `sequencer` (e.g. StepSequencer): the next
+        full pattern cycle is captured, then played back from a buffer instead of
+        being resynthesized. The tempo comes from `clock` (the sequencer's Clock) or
+        `bpm`. The track thaws automatically when the pattern, the clock's tempo,
+        the instrument or the gain changes.
+        """
+        fz = TrackFreeze(sequencer, bpm=bpm, clock=clock, ppq=ppq, sr=sr)
+        with self._lock:
+            if tr := self._tracks.get(int(channel)):
+                tr.freeze = fz
+
+    def thaw(self, channel: int) -> None:
+        with self._lock:
+            if tr := self._tracks.get(int(channel)):
+                tr.freeze = None
+
+    def is_frozen(self, channel: int) -> bool:
+        with self._lock:
+            tr = self._tracks.get(int(channel))
+            return bool(tr and tr.freeze and tr.freeze.frozen)
+
     ###########################################################################
     ##                          EVENT ROUTING                                ##
     ###########################################################################
 
     def route_event(self, e: object) -> None:
         """
-        Forward a single NoteOn/NoteOff/CC to the track matching e.channel (default 0 if missing).
+        Forward a single NoteOn/NoteOff/CC/PitchBend to the track matching e.channel (default 0 if missing).
         """
         ch = getattr(e, "channel", 0)
-        inst = None
         with self._lock:
             tr = self._tracks.get(int(ch))
-            if tr:
-                inst = tr.instrument
-        if inst is None:
+        if tr is None:
             return
-        if isinstance(e, NoteOn):
-            inst.note_on(e.note, e.velocity)
-        elif isinstance(e, NoteOff):
-            inst.note_off(e.note)
-        elif isinstance(e, CC):
-            inst.cc(e.control, e.value)
+        kind, _, d1, d2, _ = encode(e)
+        self._dispatch(tr, kind, d1, d2)
+
+    def route_events(self, events) -> None:
+        """
+        Route a batch (structured array, midi.messages.EVENT_DTYPE) or an iterable of
+        event objects. Tracks are looked up under a single lock acquisition, then each
+        channel's events go to its instrument in one `handle_events` call.
+        """
+        batch = events if isinstance(events, np.ndarray) else to_batch(events)
+        if batch.shape[0] == 0:
+            return
+        groups = self._group(batch)
+        with self._lock:
+            routed = [(self._tracks.get(ch), g) for ch, g in groups]
+
+        for tr, g in routed:
+            if tr is not None:
+                self._deliver(tr, g)
 
-    def route_events(self, events: Iterable[object]) -> None:
-        for e in events:
-            self.route_event(e)
+    @staticmethod
+    def _group(batch: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+        """Split a batch by channel: [(channel, events), ...], keeping each channel's event order."""
+        chans = batch["channel"]
+        if batch.shape[0] == 1 or (chans == chans[0]).all():
+            return [(int(chans[0]), batch)]
+        order = np.argsort(chans, kind="stable")
+        batch = batch[order]
+        cut = np.flatnonzero(np.diff(batch["channel"])) + 1
+        return [(int(g["channel"][0]), g) for g in np.split(batch, cut)]
+
+    def _deliver(self, tr: Track, g: np.ndarray) -> None:
+        if tr.batch_events and tr.freeze is None:
+            tr.instrument.handle_events(g)
+        else:
+            for kind, d1, d2 in zip(g["type"].tolist(), g["data1"].tolist(), g["data2"].tolist()):
+                self._dispatch(tr, kind, d1, d2)
+
+    def _dispatch(self, tr: Track, kind: int, d1: int, d2: int) -> None:
+        inst = tr.instrument
+        if kind == NOTE_ON:
+            if tr.freeze is not None:
+                # checked and thawed under the lock Mixer.freeze/thaw write it with
+                with self._lock:
+                    fz = tr.freeze
+                    if fz is not None and fz.tempo_changed():
+                        tr.freeze = fz = None   # loop sized for the old tempo: play live
+                    elif fz is not None and fz.pattern_changed():
+                        if fz.frozen:
+                            tr.freeze = fz = None   # thaw, and play this note live
+                        else:
+                            fz.arm()            # restart the capture on the new pattern
+                if fz is not None:
+                    fz.on_note_on()
+                    if fz.frozen:
+                        return              # the note is already in the loop buffer
+            inst.note_on(d1, d2)
+        elif kind == NOTE_OFF:
+            inst.note_off(d1)
+        elif kind == CONTROL_CHANGE:
+            inst.cc(d1, d2)
+        elif kind == PITCH_BEND:
+            inst.pitch_bend(d1)
 
     ###########################################################################
     ##                             RENDERING                                 ##
@@ -105,18 +238,81 @@ class Mixer:
         gR = np.sin(angle)
         return float(gL), float(gR)
 
-    def render(self, frames: int, sr: int, channels: int = 1) -> np.ndarray:
+    def snapshot_tracks(self) -> Tuple[List[Tuple[int, Track]], bool]:
+        """
+        Snapshot tracks outside of audio work: ([(ch, Track), ...], any_solo).
+        """
+        with self._lock:
+            tracks = list(self._tracks.items())
+            any_solo = any(t.solo for _, t in tracks)
+        return tracks, any_solo
+
+    def begin_block(self) -> Tuple[List[Tuple[int, Track]], bool]:
+        """Start a rendered block (Mixer.render, CompiledGraph.render): snapshot, clock, meters."""
+        tracks, any_solo = self.snapshot_tracks()
+        self.blocks += 1
+        self.meters.begin()
+        return tracks, any_solo
+
+    def end_block(self) -> None:
+        self.meters.publish()
+
+    def _render_split(self, tr: Track, g: np.ndarray, frames: int, sr: int) -> np.ndarray:
+        """Render the instrument in pieces, applying the events of `g` at their frame offsets."""
+        offs = np.clip(g["offset"], 0, frames - 1)
+        order = np.argsort(offs, kind="stable")
+        g, offs = g[order], offs[order]
+        cut = np.flatnonzero(np.diff(offs)) + 1
+        parts = []
+        pos = 0
+        for sub, off in zip(np.split(g, cut), offs[np.r_[0, cut]].tolist()):
+            if off > pos:
+                parts.append(tr.instrument.render(off - pos, sr))
+                pos = off
+            self._deliver(tr, sub)
+        parts.append(tr.instrument.render(frames - pos, sr))
+        return np.concatenate(parts).astype(np.float32)
+
+    def render_track(self, tr: Track, frames: int, sr: int,
+                     events: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Mono, pre-gain output of one track (from its freeze buffer when frozen),
+        through the track inserts. `events` (this track's, with frame offsets) are
+        applied sample-accurately; inserts always see the whole block.
+        """
+        fz = tr.freeze
+        if fz is not None and fz.frozen and fz.sr == sr:
+            if events is not None:
+                self._deliver(tr, events)
+            buf = fz.play(frames)
+            if tr.inserts:
+                buf = buf.copy()    # never process the loop buffer in place
+        else:
+            if events is None:
+                buf = tr.instrument.render(frames, sr).astype(np.float32)  # mono
+            else:
+                buf = self._render_split(tr, events, frames, sr)
+            if fz is not None:
+                fz.capture(buf)
+        for p in tr.inserts:
+            buf = p.process(buf, sr)
+        return buf
+
+    def render(self, frames: int, sr: int, channels: int = 1,
+               events: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Sum all tracks into mono (channels==1) or stereo (channels==2).
         Assumes each instrument.render(frames, sr) returns mono np.float32.
+        `events`: optional batch for this block, applied at their frame offsets
+        (offline rendering); live events go through route_events instead.
         """
         if channels not in (1, 2):
             raise ValueError("Only mono or stereo mixing supported currently.")
 
-        # snapshot tracks outside of audio work
-        with self._lock:
-            tracks = list(self._tracks.items())  # [(ch, Track), ...]
-            any_solo = any(t.solo for _, t in tracks)
+        tracks, any_solo = self.begin_block()
+        taps = self._taps
+        meters = self.meters
+        by_channel = dict(self._group(events)) if events is not None and events.shape[0] else {}
 
         if channels == 1:
             mix = np.zeros(frames, dtype=np.float32)
@@ -124,12 +320,17 @@ class Mixer:
             mix = np.zeros((frames, 2), dtype=np.float32)
 
         for ch, tr in tracks:
-            if tr.mute:
-                continue
-            if any_solo and not tr.solo:
+            g = by_channel.get(ch)
+            if tr.mute or (any_solo and not tr.solo):
+                if g is not None:
+                    self._deliver(tr, g)    # silent, but keep its notes consistent
+                meters.update(ch, _SILENT, tr.gain, tr.instrument.num_active_voices())
                 continue
 
-            buf = tr.instrument.render(frames, sr).astype(np.float32)  # mono
+            buf = self.render_track(tr, frames, sr, g)
+            meters.update(ch, buf, tr.gain, tr.instrument.num_active_voices())
+            for tap in taps:
+                tap(ch, tr, buf)
             if channels == 1:
                 mix += tr.gain * buf
             else:
@@ -137,4 +338,5 @@ class Mixer:
                 mix[:, 0] += tr.gain * gL * buf
                 mix[:, 1] += tr.gain * gR * buf
 
+        self.end_block()
         return mix
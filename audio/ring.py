@@ -0,0 +1,76 @@
+from typing import Optional, Tuple
+import numpy as np
+
+
+class BlockRing:
+    """
+    Single-producer / single-consumer ring of fixed-shape blocks, preallocated.
+
+    No lock: the producer only moves the write counter, the consumer only the
+    read counter, and each publishes its counter after touching the data (int
+    assignment is atomic under the GIL). Used to hand audio between the
+    callback and worker threads without blocking either side; a full ring
+    refuses the block (`push` returns False) instead of waiting.
+    """
+    def __init__(self, slots: int, block_shape: Tuple[int, ...], dtype=np.float32):
+        self.slots = max(1, int(slots))
+        self.buf = np.zeros((self.slots,) + tuple(block_shape), dtype=dtype)
+        self._w = 0     # blocks written (producer side)
+        self._r = 0     # blocks read (consumer side)
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._w - self._r
+
+    def full(self) -> bool:
+        return self._w - self._r >= self.slots
+
+    def clear(self) -> None:
+        """Consumer side: discard everything written so far."""
+        self._r = self._w
+
+    # --- producer ---
+    def write_view(self) -> Optional[np.ndarray]:
+        """Next free slot to fill in place (then `commit_write`), or None if full."""
+        if self._w - self._r >= self.slots:
+            return None
+        return self.buf[self._w % self.slots]
+
+    def commit_write(self) -> None:
+        self._w += 1
+
+    def write_slot(self) -> int:
+        """Index in `buf` of the slot `write_view` returns (for side tables kept per slot)."""
+        return self._w % self.slots
+
+    def push(self, block: np.ndarray) -> bool:
+        """Copy `block` in; False (and counted as dropped) if the ring is full."""
+        view = self.write_view()
+        if view is None:
+            self.dropped += 1
+            return False
+        view[...] = block
+        self._w += 1
+        return True
+
+    # --- consumer ---
+    def read_view(self) -> Optional[np.ndarray]:
+        """Oldest unread slot (valid until `commit_read`), or None if empty."""
+        if self._w == self._r:
+            return None
+        return self.buf[self._r % self.slots]
+
+    def commit_read(self) -> None:
+        self._r += 1
+
+    def read_slot(self) -> int:
+        """Index in `buf` of the slot `read_view` returns."""
+        return self._r % self.slots
+
+    def pop_into(self, out: np.ndarray) -> bool:
+        view = self.read_view()
+        if view is None:
+            return False
+        out[...] = view
+        self._r += 1
+        return True
@@ -0,0 +1,271 @@
+from __future__ import annotations
+import builtins
+import gc
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class ComponentStats:
+    calls: int = 0
+    alloc_bytes: int = 0          # transient allocation peaks, summed over calls
+    max_alloc_bytes: int = 0      # worst single interval
+    lock_waits: int = 0           # acquisitions slower than the threshold
+    max_lock_wait: float = 0.0    # seconds
+    prints: int = 0               # print() and logging calls
+    gc_collections: int = 0
+    sites: Dict[str, int] = field(default_factory=dict)   # "kind at file:line (function)" -> count
+
+
+class _AuditedLock:
+    """Stands in for a component's lock: times acquisitions made from the audited thread."""
+    def __init__(self, lock, name: str, audit: "RTAudit"):
+        self._lock = lock
+        self._name = name
+        self._audit = audit
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._audit._thread != threading.get_ident():
+            return self._lock.acquire(blocking, timeout)
+        t0 = time.perf_counter()
+        ok = self._lock.acquire(blocking, timeout)
+        self._audit._lock_wait(self._name, time.perf_counter() - t0)
+        return ok
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc) -> None:
+        self._lock.release()
+
+
+class RTAudit:
+    """
+    Real-time safety audit of the audio thread (debug only: tracemalloc makes
+    everything slower). While a block is processed, it records
+
+    - allocations: transient tracemalloc peaks, per interval between sections,
+    - lock acquisitions that waited longer than `lock_threshold` seconds,
+    - print() and logging calls, with their call site,
+    - garbage collections,
+
+    and attributes each to the innermost active component: the engine itself,
+    event routing, the mixer, or a track (its instrument and inserts). Components
+    are hooked by `install` (instance attributes shadowing methods, locks wrapped)
+    and unhooked by `uninstall`.
+    """
+    def __init__(self, lock_threshold: float = 50e-6):
+        self.lock_threshold = float(lock_threshold)
+        self.stats: Dict[str, ComponentStats] = {}
+        self.blocks = 0
+        self._thread: Optional[int] = None
+        self._stack: List[str] = []
+        self._mark = 0
+        self._undo: List[Callable[[], None]] = []
+        self._started_tracemalloc = False
+
+    ###########################################################################
+    ##                           HOOKS                                       ##
+    ###########################################################################
+
+    def install(self, engine) -> None:
+        """Hook the engine's mixer, its tracks (instrument, inserts) and the global print/logging/gc."""
+        if self._undo:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        mixer = engine.mixer
+        self._wrap_method(mixer, "route_events", "events")
+        self._wrap_method(mixer, "render", "mixer")
+        self._wrap_lock(mixer, "mixer")
+        mixer = getattr(mixer, "mixer", mixer)      # an AudioGraph's Mixer
+        self._wrap_lock(mixer, "mixer")
+        tracks, _ = mixer.snapshot_tracks()
+        for ch, tr in tracks:
+            name = f"track {ch}: {type(tr.instrument).__name__}"
+            inst = tr.instrument
+            for meth in ("render", "handle_events", "note_on", "note_off", "cc", "pitch_bend"):
+                self._wrap_method(inst, meth, name)
+            self._wrap_lock(inst, name)
+            inner = getattr(inst, "inner_instrument", None)
+            if inner is not None:
+                self._wrap_lock(inner, name)
+            for i, p in enumerate(tr.inserts):
+                self._wrap_method(p, "process", f"{name} / insert {i}: {type(p).__name__}")
+
+        orig_print = builtins.print
+        def audited_print(*args, **kwargs):
+            self._output("print")
+            return orig_print(*args, **kwargs)
+        builtins.print = audited_print
+        self._undo.append(lambda: setattr(builtins, "print", orig_print))
+
+        orig_handle = logging.Logger.handle
+        def audited_handle(logger, record):
+            self._output("logging")
+            return orig_handle(logger, record)
+        logging.Logger.handle = audited_handle
+        self._undo.append(lambda: setattr(logging.Logger, "handle", orig_handle))
+
+        gc.callbacks.append(self._on_gc)
+        self._undo.append(lambda: gc.callbacks.remove(self._on_gc))
+
+    def uninstall(self) -> None:
+        while self._undo:
+            self._undo.pop()()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _wrap_method(self, obj, meth: str, name: str) -> None:
+        fn = getattr(obj, meth, None)
+        if fn is None:
+            return
+        def audited(*args, **kwargs):
+            self.enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.exit()
+        setattr(obj, meth, audited)
+        self._undo.append(lambda: obj.__dict__.pop(meth, None))
+
+    def _wrap_lock(self, obj, name: str) -> None:
+        lock = getattr(obj, "_lock", None)
+        if lock is None or isinstance(lock, _AuditedLock):
+            return
+        obj._lock = _AuditedLock(lock, name, self)
+        self._undo.append(lambda: setattr(obj, "_lock", lock))
+
+    ###########################################################################
+    ##                      BLOCKS AND SECTIONS                              ##
+    ###########################################################################
+
+    def begin_block(self) -> None:
+        self._thread = threading.get_ident()
+        self._stack = []
+        self.enter("engine")
+
+    def end_block(self) -> None:
+        self.exit()
+        self._thread = None
+        self.blocks += 1
+
+    def enter(self, name: str) -> None:
+        if self._thread != threading.get_ident():
+            return
+        self._flush()
+        self._stack.append(name)
+        self._component().calls += 1
+
+    def exit(self) -> None:
+        if self._thread != threading.get_ident() or not self._stack:
+            return
+        self._flush()
+        self._stack.pop()
+
+    def _component(self) -> ComponentStats:
+        name = self._stack[-1] if self._stack else "engine"
+        st = self.stats.get(name)
+        if st is None:
+            st = self.stats[name] = ComponentStats()
+        return st
+
+    def _flush(self) -> None:
+        """Charge the allocation peak since the last boundary to the current component."""
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            grown = max(0, peak - self._mark)
+            st = self._component()
+            st.alloc_bytes += grown
+            st.max_alloc_bytes = max(st.max_alloc_bytes, grown)
+        tracemalloc.reset_peak()
+        self._mark = current
+
+    ###########################################################################
+    ##                            EVENTS                                     ##
+    ###########################################################################
+
+    def _site(self, kind: str, depth: int) -> None:
+        f = sys._getframe(depth)
+        key = f"{kind} at {f.f_code.co_filename}:{f.f_lineno} ({f.f_code.co_name})"
+        sites = self._component().sites
+        sites[key] = sites.get(key, 0) + 1
+
+    def _output(self, kind: str) -> None:
+        if self._thread != threading.get_ident():
+            return
+        self._component().prints += 1
+        self._site(kind, 3)
+
+    def _lock_wait(self, name: str, wait: float) -> None:
+        if wait <= self.lock_threshold:
+            return
+        st = self._component()
+        st.lock_waits += 1
+        st.max_lock_wait = max(st.max_lock_wait, wait)
+        self._site(f"lock of {name}", 3)
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == "start" and self._thread == threading.get_ident():
+            st = self._component()
+            st.gc_collections += 1
+            key = f"gc generation {info.get('generation')}"
+            st.sites[key] = st.sites.get(key, 0) + 1
+
+    ###########################################################################
+    ##                            REPORT                                     ##
+    ###########################################################################
+
+    def reset(self) -> None:
+        self.stats = {}
+        self.blocks = 0
+
+    def report(self) -> dict:
+        """Machine-readable summary: blocks audited and per-component statistics."""
+        return {
+            "blocks": self.blocks,
+            "components": {name: {
+                "calls": st.calls,
+                "alloc_bytes_per_block": st.alloc_bytes / max(1, self.blocks),
+                "max_alloc_bytes": st.max_alloc_bytes,
+                "lock_waits": st.lock_waits,
+                "max_lock_wait_ms": 1e3 * st.max_lock_wait,
+                "prints": st.prints,
+                "gc_collections": st.gc_collections,
+                "sites": dict(st.sites),
+            } for name, st in sorted(self.stats.items())},
+        }
+
+    def violations(self) -> List[str]:
+        """One line per component with lock waits, prints or GC passes (allocations not included)."""
+        out = []
+        for name, st in sorted(self.stats.items()):
+            if st.lock_waits or st.prints or st.gc_collections:
+                out.append(f"{name}: {st.lock_waits} lock waits (max {1e3 * st.max_lock_wait:.2f} ms), "
+                           f"{st.prints} prints, {st.gc_collections} GC passes")
+        return out
+
+    def format_report(self) -> str:
+        lines = [f"RT audit over {self.blocks} blocks"]
+        for name, r in self.report()["components"].items():
+            lines.append(f"  {name:<48} alloc {r['alloc_bytes_per_block'] / 1024:8.1f} KiB/block"
+                         f"  max {r['max_alloc_bytes'] / 1024:8.1f} KiB  locks {r['lock_waits']:4d}"
+                         f"  prints {r['prints']:4d}  gc {r['gc_collections']:3d}")
+            for site, n in sorted(r["sites"].items(), key=lambda kv: -kv[1])[:5]:
+                lines.append(f"      {n:6d} x {site}")
+        return "\n".join(lines)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import threading
+from typing import Callable, Optional, Tuple
+import numpy as np
+
+from audio.ring import BlockRing
+
+
+class SpectrumAnalyzer:
+    """
+    Live spectrum / spectrogram, computed off the audio thread.
+
+    The audio thread only calls `push` (one copy into a preallocated BlockRing).
+    A worker thread keeps the last `fft_size` samples (stereo is averaged to
+    mono) and, `frame_rate` times per second of audio, takes a Hann-windowed
+    rfft, sums its power into `bands` log-spaced bands from `fmin` to `fmax`
+    and publishes them in dB (0 dB: a full-scale sine within one band). When it
+    falls behind, only the newest due frame is computed and the others are
+    counted in `dropped_frames`; a full ring drops blocks (`ring.dropped`).
+    Pushed blocks have `blocksize` frames: the engine quantum.
+
+    `latest()` returns the newest frame without blocking; `spectrogram()` the
+    last `history` frames. Taps: the engine pushes its output
+    (AudioEngine(spectrum=True)); `mixer.add_tap(analyzer.track_tap(ch))` feeds
+    one track (mono, pre-gain) into an analyzer started with `start()`.
+    """
+    def __init__(self, sr: int = 44100, blocksize: int = 256, channels: int = 1,
+                 fft_size: int = 2048, bands: int = 64, fmin: float = 20.0,
+                 fmax: Optional[float] = None, frame_rate: float = 30.0,
+                 history: int = 256, slots: int = 64):
+        self.sr = int(sr)
+        self.fft_size = int(fft_size)
+        self.hop = max(1, int(round(self.sr / float(frame_rate))))
+        shape = (int(blocksize),) if channels == 1 else (int(blocksize), int(channels))
+        self.ring = BlockRing(slots, shape)
+
+        # log-spaced bands over the rfft bins [lo, hi), at least one bin each
+        fmax = 0.5 * self.sr if fmax is None else float(fmax)
+        self.edges = np.geomspace(float(fmin), fmax, int(bands) + 1)
+        df = self.sr / float(self.fft_size)
+        nbins = self.fft_size // 2 + 1
+        self._lo = np.clip(np.floor(self.edges[:-1] / df).astype(np.intp), 0, nbins - 1)
+        self._hi = np.clip(np.maximum(np.ceil(self.edges[1:] / df).astype(np.intp), self._lo + 1), 1, nbins)
+        self.centers = np.sqrt(self.edges[:-1] * self.edges[1:])
+
+        self._window = np.hanning(self.fft_size)
+        self._scale = 4.0 / (self.fft_size * np.sum(self._window ** 2))   # full-scale sine -> 1
+        self._hist = np.zeros(self.fft_size)
+        self._since = 0                                     # samples since the last frame
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self._latest: Tuple[int, np.ndarray] = (0, np.full(int(bands), -120.0))
+        self._gram = np.full((max(1, int(history)), int(bands)), -120.0)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    ###########################################################################
+    ##                            AUDIO THREAD                               ##
+    ###########################################################################
+
+    def push(self, block: np.ndarray) -> bool:
+        """Copy one block in (audio thread); False if the ring was full."""
+        return self.ring.push(block)
+
+    def track_tap(self, channel: int) -> Callable:
+        """Mixer tap (see Mixer.add_tap) pushing the output of track `channel`."""
+        def tap(ch, track, buf):
+            if ch == channel:
+                self.ring.push(buf)
+        return tap
+
+    ###########################################################################
+    ##                               WORKER                                  ##
+    ###########################################################################
+
+    def start(self) -> None:
+        self.ring.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, name="SpectrumThread", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _worker(self) -> None:
+        nap = 0.5 * self.hop / float(self.sr)
+        while not self._stop.is_set():
+            if not self.update():
+                self._stop.wait(nap)
+
+    def update(self) -> bool:
+        """Consume the ring and compute the newest due frame (worker side). True if one was made."""
+        hist = self._hist
+        while (view := self.ring.read_view()) is not None:
+            x = view.mean(axis=1) if view.ndim == 2 else view
+            n = min(x.shape[0], hist.shape[0])
+            hist[:-n] = hist[n:]
+            hist[-n:] = x[-n:]
+            self.ring.commit_read()
+            self._since += x.shape[0]
+        if self._since < self.hop:
+            return False
+        due = self._since // self.hop
+        self._since -= due * self.hop
+        self.dropped_frames += due - 1
+        self._analyze()
+        return True
+
+    def _analyze(self) -> None:
+        spec = np.fft.rfft(self._hist * self._window)
+        power = (spec.real ** 2 + spec.imag ** 2) * self._scale
+        cs = np.concatenate(([0.0], np.cumsum(power)))
+        bands = cs[self._hi] - cs[self._lo]
+        db = 10.0 * np.log10(np.maximum(bands, 1e-12))
+        self._gram[self.frames % self._gram.shape[0]] = db
+        self.frames += 1
+        self._latest = (self.frames, db)        # one reference assignment: readers never wait
+
+    ###########################################################################
+    ##                               READERS                                 ##
+    ###########################################################################
+
+    def latest(self) -> Tuple[int, np.ndarray]:
+        """(frame number, band levels in dB) of the newest frame; frame 0: nothing yet."""
+        return self._latest
+
+    def spectrogram(self) -> np.ndarray:
+        """Last frames (oldest first), shape (min(frames, history), bands), in dB."""
+        n = self.frames
+        rows = self._gram.shape[0]
+        if n <= rows:
+            return self._gram[:n].copy()
+        k = n % rows
+        return np.concatenate([self._gram[k:], self._gram[:k]])
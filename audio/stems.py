@@ -0,0 +1,183 @@
+from __future__ import annotations
+import threading
+import wave
+from typing import Dict, List, Optional
+import numpy as np
+
+from audio.ring import BlockRing
+
+
+class _Stem:
+    """One track's ring (post-gain blocks, with the mixer block number of each slot) and file."""
+    def __init__(self, channel: int, path: str, slots: int, blocksize: int, writer: int):
+        self.channel = channel
+        self.path = path
+        self.ring = BlockRing(slots, (blocksize,))
+        self.block_of = np.zeros(self.ring.slots, dtype=np.int64)
+        self.writer = writer
+        self.wav: Optional[wave.Wave_write] = None
+        self.next_block = 0         # mixer block expected next in the file
+        self.written = 0            # blocks written, silence included
+        self.mismatched = 0         # blocks of the wrong size (not recorded)
+
+
+class StemRecorder:
+    """
+    Records every mixer track to its own 16-bit mono WAV file while playing.
+
+    Installed as a Mixer (or AudioGraph) tap: on the audio thread, each rendered
+    track costs one scaled copy of its buffer (post-gain, pre-pan) into that
+    track's ring. Rings are preallocated in `start` for the tracks present then;
+    call `add_track` for a track added while recording (until then its blocks are
+    counted in `unknown_blocks`, not recorded). A pool of `writers` threads
+    streams the rings to `path_pattern.format(channel=ch)`; blocks where a track
+    was not rendered (muted, soloed out) are written as silence, so all stems
+    stay aligned from `start` to `stop`. A full ring drops the block: drops are
+    counted per stem (`report`).
+    """
+    def __init__(self, path_pattern: str = "stem_{channel:02d}.wav", sr: int = 44100,
+                 blocksize: int = 256, slots: int = 256, writers: int = 2):
+        self.path_pattern = path_pattern
+        self.sr = int(sr)
+        self.blocksize = int(blocksize)
+        self.slots = int(slots)
+        self.writers = max(1, int(writers))
+        self._stems: Dict[int, _Stem] = {}
+        self._mixer = None
+        self._running = False
+        self._first = 0                 # mixer block at start
+        self.unknown_blocks = 0         # blocks of tracks without a stem
+        self._last: Optional[int] = None    # last mixer block to record (set by stop)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    ###########################################################################
+    ##                              LIFECYCLE                                ##
+    ###########################################################################
+
+    def start(self, mixer) -> None:
+        self._mixer = mixer
+        self._running = True
+        self._stop.clear()
+        self._last = None
+        self._first = mixer.blocks + 1
+        self._stems = {}
+        self.unknown_blocks = 0
+        tracks, _ = mixer.snapshot_tracks()
+        for ch, _ in tracks:
+            self._add_stem(ch)
+        mixer.add_tap(self.tap)
+        self._threads = [threading.Thread(target=self._writer, args=(i,), name=f"StemWriter{i}")
+                         for i in range(self.writers)]
+        for th in self._threads:
+            th.start()
+        print(f"[REC] Recording {len(self._stems)} stems to {self.path_pattern}")
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        self._mixer.remove_tap(self.tap)
+        self._last = self._mixer.blocks
+        self._stop.set()
+        for th in self._threads:
+            th.join()
+        self._threads = []
+        for st in list(self._stems.values()):
+            if st.ring.dropped or st.mismatched:
+                print(f"[REC] stem {st.channel}: {st.ring.dropped} blocks dropped, "
+                      f"{st.mismatched} of the wrong size")
+        if self.unknown_blocks:
+            print(f"[REC] {self.unknown_blocks} blocks of tracks added without add_track")
+
+    def add_track(self, channel: int) -> None:
+        """Record a track added while recording (control side: allocates its ring)."""
+        if self._running and int(channel) not in self._stems:
+            self._add_stem(int(channel))
+
+    def _add_stem(self, channel: int) -> _Stem:
+        st = _Stem(channel, self.path_pattern.format(channel=channel), self.slots,
+                   self.blocksize, len(self._stems) % self.writers)
+        st.next_block = self._first
+        self._stems[channel] = st
+        return st
+
+    ###########################################################################
+    ##                            AUDIO THREAD                               ##
+    ###########################################################################
+
+    def tap(self, channel: int, track, buf: np.ndarray) -> None:
+        st = self._stems.get(channel)
+        if st is None:
+            self.unknown_blocks += 1
+            return
+        if buf.shape[0] != self.blocksize:
+            st.mismatched += 1
+            return
+        ring = st.ring
+        view = ring.write_view()
+        if view is None:
+            ring.dropped += 1
+            return
+        np.multiply(buf, track.gain, out=view)
+        st.block_of[ring.write_slot()] = self._mixer.blocks
+        ring.commit_write()
+
+    ###########################################################################
+    ##                              WRITERS                                  ##
+    ###########################################################################
+
+    def _writer(self, index: int) -> None:
+        nap = min(0.02, 0.125 * self.slots * self.blocksize / float(self.sr))
+        mine: List[_Stem] = []
+        while True:
+            stopping = self._stop.is_set()
+            mine = [st for st in list(self._stems.values()) if st.writer == index]
+            busy = False
+            for st in mine:
+                busy |= self._flush(st)
+            if stopping:
+                break
+            if not busy:
+                self._stop.wait(nap)
+        for st in mine:
+            self._pad(st, self._last + 1)
+            if st.wav is not None:
+                st.wav.close()
+                st.wav = None
+
+    def _flush(self, st: _Stem) -> bool:
+        """Write what the stem's ring holds, with silence for skipped blocks. True if anything."""
+        if st.wav is None:
+            st.wav = wave.open(st.path, mode='wb')
+            st.wav.setnchannels(1)
+            st.wav.setsampwidth(2)  # 16-bit
+            st.wav.setframerate(self.sr)
+        ring = st.ring
+        n = 0
+        while (view := ring.read_view()) is not None:
+            block = int(st.block_of[ring.read_slot()])
+            self._pad(st, block)
+            st.wav.writeframes((np.clip(view, -1.0, 1.0) * 32767.0).astype(np.int16).tobytes())
+            ring.commit_read()
+            st.next_block = block + 1
+            st.written += 1
+            n += 1
+        return n > 0
+
+    def _pad(self, st: _Stem, block: int) -> None:
+        """Silence up to (not including) mixer block `block`."""
+        gap = block - st.next_block
+        if gap > 0 and st.wav is not None:
+            st.wav.writeframes(bytes(2 * self.blocksize * gap))
+            st.next_block = block
+            st.written += gap
+
+    ###########################################################################
+    ##                               REPORT                                  ##
+    ###########################################################################
+
+    def report(self) -> Dict[int, dict]:
+        return {ch: {"path": st.path, "blocks": st.written, "dropped": st.ring.dropped,
+                     "wrong_size": st.mismatched}
+                for ch, st in sorted(self._stems.items())}
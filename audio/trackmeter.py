@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import List
+import numpy as np
+
+from audio.meter import lin_to_dbfs
+import kernels
+
+TRACK_METER_DTYPE = np.dtype([
+    ("channel", np.int32),
+    ("peak", np.float32),       # post-gain sample peak over the window
+    ("rms", np.float32),        # post-gain RMS over the window
+    ("voices", np.int32),       # active voices after the last block
+    ("frames", np.int64),       # frames in the window
+])
+
+# TrackMeterBank._acc columns
+CHANNEL, PEAK, SUMSQ, FRAMES, VOICES = range(5)
+
+
+class TrackMeterBank:
+    """
+    Per-track peak / RMS / voice count, written by Mixer.render from the buffers
+    it already has and read by monitoring threads without taking the mixer lock.
+
+    Double-buffered: the writer accumulates the current window, fills the back
+    table at the end of each block and flips `_front`; a reader copies the front
+    table and retries if a flip happened meanwhile (sequence counter). Both
+    tables and the accumulator are preallocated for `capacity` tracks.
+    """
+    def __init__(self, capacity: int = 64):
+        self.capacity = int(capacity)
+        self._tables = [np.zeros(self.capacity, dtype=TRACK_METER_DTYPE) for _ in range(2)]
+        self._sizes = [0, 0]
+        self._front = 0
+        self._seq = 0
+        self._reset_req = False
+        # writer side, current window, one row per track: CHANNEL, PEAK, SUMSQ, FRAMES, VOICES
+        self._acc = np.zeros((self.capacity, 5))
+        self._acc[:, CHANNEL] = -1
+        self._n = 0
+        kernels.prepare("peak_energy")
+
+    ###########################################################################
+    ##                          WRITER (AUDIO THREAD)                        ##
+    ###########################################################################
+
+    def begin(self) -> None:
+        if self._reset_req:
+            self._reset_req = False
+            self._acc[:, PEAK:FRAMES + 1] = 0.0
+        self._n = 0
+
+    def update(self, channel: int, buf: np.ndarray, gain: float, voices: int) -> None:
+        """One track's mono pre-gain block (peak and energy are scaled by `gain`)."""
+        if self._n == self.capacity:
+            return
+        a = self._acc[self._n]
+        if a[CHANNEL] != channel:
+            a[CHANNEL], a[PEAK], a[SUMSQ], a[FRAMES] = channel, 0.0, 0.0, 0.0
+        if buf.size:
+            k = kernels.jit("peak_energy")
+            if k is not None and buf.dtype == np.float32 and buf.flags.c_contiguous:
+                peak, sumsq = k(buf)        # one pass over the block
+            else:
+                peak, sumsq = max(float(buf.max()), -float(buf.min())), float(np.dot(buf, buf))
+            peak *= abs(gain)
+            if peak > a[PEAK]:
+                a[PEAK] = peak
+            a[SUMSQ] += gain * gain * sumsq
+        a[FRAMES] += buf.shape[0]
+        a[VOICES] = voices
+        self._n += 1
+
+    def publish(self) -> None:
+        back = 1 - self._front
+        t = self._tables[back]
+        n = self._n
+        acc = self._acc[:n]
+        t["channel"][:n] = acc[:, CHANNEL]
+        t["peak"][:n] = acc[:, PEAK]
+        t["rms"][:n] = np.sqrt(acc[:, SUMSQ] / np.maximum(acc[:, FRAMES], 1.0))
+        t["voices"][:n] = acc[:, VOICES]
+        t["frames"][:n] = acc[:, FRAMES]
+        self._sizes[back] = self._n
+        self._front = back
+        self._seq += 1
+
+    ###########################################################################
+    ##                               READERS                                 ##
+    ###########################################################################
+
+    def read(self) -> np.ndarray:
+        """Copy of the latest table (TRACK_METER_DTYPE, one row per rendered track)."""
+        while True:
+            seq = self._seq
+            front = self._front
+            out = self._tables[front][:self._sizes[front]].copy()
+            if self._seq == seq:
+                return out
+
+    def snapshot_and_reset(self) -> List[dict]:
+        """Per-track levels since the last reset; the next block starts a new window."""
+        table = self.read()
+        self._reset_req = True
+        return [{
+            "channel": int(r["channel"]),
+            "peak_lin": float(r["peak"]),
+            "rms_lin": float(r["rms"]),
+            "peak_db": lin_to_dbfs(float(r["peak"])),
+            "rms_db": lin_to_dbfs(float(r["rms"])),
+            "voices": int(r["voices"]),
+            "frames": int(r["frames"]),
+        } for r in table]
@@ -0,0 +1,54 @@
+"""
+Render cost of the additive backends versus partial count.
+
+    python -m benchmarks.bench_additive [--voices 8] [--blocksize 256]
+
+Holds `voices` notes of a make_spectral_frequency instrument with P partials
+and reports microseconds per block for the "stack" and "ifft" backends.
+"""
+import argparse
+import time
+import numpy as np
+
+from instruments.additive import make_spectral_frequency, PartialCharacteristics
+from instruments.envelopes.adsr import ADSR
+
+
+def make_partials(P: int):
+    rng = np.random.default_rng(P)
+    ratios = np.sort(1.0 + rng.uniform(0.0, 30.0, P))
+    ratios[0] = 1.0
+    return {float(r): PartialCharacteristics(1.0 / (k + 1), 0.0, ADSR(0.005, 0.1, 0.5, 0.3))
+            for k, r in enumerate(ratios)}
+
+
+def bench(backend: str, P: int, voices: int, blocksize: int, sr: int, blocks: int) -> float:
+    inst = make_spectral_frequency(make_partials(P), master=0.5, backend=backend, hop=blocksize)
+    for k in range(voices):
+        inst.note_on(110.0 * 2 ** (k / 12), 100)
+    inst.render(blocksize, sr)
+    t0 = time.perf_counter()
+    for _ in range(blocks):
+        inst.render(blocksize, sr)
+    return 1e6 * (time.perf_counter() - t0) / blocks
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--voices", type=int, default=8)
+    ap.add_argument("--blocksize", type=int, default=256)
+    ap.add_argument("--sr", type=int, default=44100)
+    ap.add_argument("--blocks", type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"voices={args.voices} blocksize={args.blocksize} "
+          f"(block budget {1e6 * args.blocksize / args.sr:.0f} us)")
+    print(f"{'partials':>8} {'stack us':>10} {'ifft us':>10}")
+    for P in (10, 28, 64, 128, 256):
+        t_stack = bench("stack", P, args.voices, args.blocksize, args.sr, args.blocks)
+        t_ifft = bench("ifft", P, args.voices, args.blocksize, args.sr, args.blocks)
+        print(f"{P:8d} {t_stack:10.1f} {t_ifft:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+CPU cost of PartitionedConvolver per second of impulse response.
+
+    python -m benchmarks.bench_convolution [--blocksize 256] [--channels 2]
+
+For each IR length, processes 10 s of noise block by block and reports the
+fraction of real time spent (load) and that load divided by the IR length.
+"""
+import argparse
+import time
+import numpy as np
+
+from audio.convolution import PartitionedIR, PartitionedConvolver
+
+
+def bench(ir_seconds: float, blocksize: int, channels: int, sr: int, seconds: float) -> dict:
+    rng = np.random.default_rng(0)
+    n = int(ir_seconds * sr)
+    ir = (rng.standard_normal(n) * np.exp(-np.arange(n) / (0.3 * n))).astype(np.float32)
+    conv = PartitionedConvolver(PartitionedIR(ir, blocksize, sr))
+    blocks = int(seconds * sr) // blocksize
+    x = rng.standard_normal((blocksize, channels)).astype(np.float32) * 0.1
+
+    conv.process(x, sr)   # allocate the FDL outside the timing
+    t0 = time.perf_counter()
+    for _ in range(blocks):
+        conv.process(x, sr)
+    elapsed = time.perf_counter() - t0
+
+    audio_sec = blocks * blocksize / sr
+    load = elapsed / audio_sec
+    return {
+        "ir_sec": ir_seconds,
+        "partitions": conv.ir.partitions,
+        "us_per_block": 1e6 * elapsed / blocks,
+        "load": load,
+        "load_per_ir_sec": load / ir_seconds,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--blocksize", type=int, default=256)
+    ap.add_argument("--channels", type=int, default=2)
+    ap.add_argument("--sr", type=int, default=44100)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+
+    budget_us = 1e6 * args.blocksize / args.sr
+    print(f"blocksize={args.blocksize} channels={args.channels} sr={args.sr} "
+          f"(block budget {budget_us:.0f} us)")
+    print(f"{'IR [s]':>7} {'parts':>6} {'us/block':>9} {'load':>7} {'load/IR s':>10}")
+    for ir_sec in (0.25, 0.5, 1.0, 2.0, 4.0):
+        r = bench(ir_sec, args.blocksize, args.channels, args.sr, args.seconds)
+        print(f"{r['ir_sec']:7.2f} {r['partitions']:6d} {r['us_per_block']:9.1f} "
+              f"{100 * r['load']:6.1f}% {100 * r['load_per_ir_sec']:9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Envelope evaluation cost per block over a full note (attack to end of release).
+
+    python -m benchmarks.bench_envelopes [--partials 28] [--blocksize 256]
+
+Compares one ADSR.render call per partial (audio rate) with ADSRArray, at
+audio rate and at control rates of 16 and 32 samples.
+"""
+import argparse
+import time
+import numpy as np
+
+from instruments.envelopes.adsr import ADSR, ADSRArray
+from instruments.envelopes.control import ControlGrid
+
+
+def params(P: int):
+    rng = np.random.default_rng(0)
+    return [(rng.uniform(0.001, 0.02), rng.uniform(0.02, 0.3), rng.uniform(0.0, 0.8),
+             rng.uniform(0.05, 0.5)) for _ in range(P)]
+
+
+def note(render, gate_on, gate_off, hold_blocks: int, release_blocks: int) -> float:
+    gate_on()
+    t0 = time.perf_counter()
+    for _ in range(hold_blocks):
+        render()
+    gate_off()
+    for _ in range(release_blocks):
+        render()
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--partials", type=int, default=28)
+    ap.add_argument("--blocksize", type=int, default=256)
+    ap.add_argument("--sr", type=int, default=44100)
+    ap.add_argument("--hold", type=float, default=0.5, help="seconds before gate off")
+    args = ap.parse_args()
+
+    B, sr = args.blocksize, args.sr
+    ps = params(args.partials)
+    hold = int(args.hold * sr / B)
+    release = int(0.5 * sr / B) + 1
+    blocks = hold + release
+
+    envs = [ADSR(*p) for p in ps]
+    t_ref = note(lambda: [e.render(B, sr) for e in envs],
+                 lambda: [e.gate_on() for e in envs], lambda: [e.gate_off() for e in envs],
+                 hold, release)
+    print(f"partials={args.partials} blocksize={B}: us per block over one note")
+    print(f"  ADSR.render per partial   {1e6 * t_ref / blocks:8.1f}")
+
+    for step in (1, 16, 32):
+        arr = ADSRArray(*zip(*ps))
+        grid = ControlGrid(step) if step > 1 else None
+        t = note(lambda: arr.render(B, sr, grid), arr.gate_on, arr.gate_off, hold, release)
+        label = "audio rate" if step == 1 else f"control step {step}"
+        print(f"  ADSRArray, {label:<15}{1e6 * t / blocks:8.1f}   (x{t_ref / t:.1f})")
+
+
+if __name__ == "__main__":
+    main()
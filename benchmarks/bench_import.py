@@ -0,0 +1,78 @@
+"""
+Import time of the headless core, in fresh interpreters.
+
+    python -m benchmarks.bench_import [--runs 5] [--budget 0.3]
+
+Imports the instruments and the mixer (what a render worker needs), and fails
+(exit status 1) if the best of `runs` takes longer than `budget` seconds or if
+GUI/audio-device modules got pulled in on the way.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+CORE = ("instruments.additive", "instruments.midi", "instruments.tuning", "audio.mixer")
+FORBIDDEN = ("matplotlib", "sounddevice")
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {modules}
+dt = time.perf_counter() - t0
+print(dt, ",".join(m for m in {forbidden!r} if m in sys.modules))
+"""
+
+
+def measure(root: str) -> tuple:
+    code = PROBE.format(modules=", ".join(CORE), forbidden=FORBIDDEN)
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), (out[1].split(",") if len(out) > 1 else [])
+
+
+def slowest_modules(root: str, n: int = 8) -> list:
+    """Top cumulative entries of -X importtime (microseconds, module)."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(CORE)],
+                         cwd=root, check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines()[1:]:
+        parts = line.split("|")
+        if len(parts) == 3:
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=0.3, help="seconds")
+    args = ap.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times, loaded = [], set()
+    for _ in range(args.runs):
+        dt, mods = measure(root)
+        times.append(dt)
+        loaded.update(mods)
+
+    best = min(times)
+    print(f"import {', '.join(CORE)}")
+    print(f"  best {1e3 * best:7.1f} ms   median {1e3 * sorted(times)[len(times) // 2]:7.1f} ms"
+          f"   budget {1e3 * args.budget:.0f} ms")
+    print("  slowest (cumulative):")
+    for us, name in slowest_modules(root):
+        print(f"    {us / 1e3:7.1f} ms  {name}")
+
+    ok = True
+    if loaded:
+        print(f"FAIL: optional modules imported: {', '.join(sorted(loaded))}")
+        ok = False
+    if best > args.budget:
+        print("FAIL: over budget")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+JIT kernels against their NumPy implementations.
+
+    python -m benchmarks.bench_kernels [--frames 256] [--blocks 400] [--rows 16]
+
+Renders the same material with the "numpy" and "numba" kernel backends, checks
+that the outputs are identical and prints the time per block of each.
+"""
+import argparse
+import time
+import numpy as np
+
+import kernels
+from audio.filterbank import BiquadBank
+from instruments.envelopes.adsr import ADSR
+from instruments.envelopes.peak import PeakEnvelope
+from instruments.signals.osc import SawNaive
+
+SR = 44100
+
+
+def run_adsr(frames, blocks, rows):
+    env = ADSR(0.01, 0.2, 0.6, 0.3)
+    out = []
+    for b in range(blocks):
+        if b % 100 == 0:
+            env.gate_on()
+        elif b % 100 == 60:
+            env.gate_off()
+        out.append(env.render(frames, SR))
+    return np.concatenate(out)
+
+
+def run_peak(frames, blocks, rows):
+    env = PeakEnvelope(0.005, 0.5)
+    out = []
+    for b in range(blocks):
+        if b % 100 == 0:
+            env.gate_on()
+        out.append(env.render(frames, SR))
+    return np.concatenate(out)
+
+
+def run_saw(frames, blocks, rows):
+    osc = SawNaive()
+    return np.concatenate([osc.render(110.0 + b, frames, SR) for b in range(blocks)])
+
+
+def run_biquad(frames, blocks, rows):
+    rng = np.random.default_rng(0)
+    bank = BiquadBank(size=rows, cutoff=1200.0, q=2.0)
+    slots = np.array([bank.allocate() for _ in range(rows)])
+    bank.set_cutoff(300.0, slots[::2])      # two gliding coefficient sets
+    out = []
+    for _ in range(blocks):
+        x = rng.standard_normal((rows, frames)).astype(np.float32)
+        out.append(bank.process(x, slots, SR).copy())
+    return np.concatenate(out, axis=1)
+
+
+RUNS = {"adsr": run_adsr, "peak": run_peak, "saw": run_saw, "biquad": run_biquad}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=256)
+    ap.add_argument("--blocks", type=int, default=400)
+    ap.add_argument("--rows", type=int, default=16, help="biquad rows per block")
+    args = ap.parse_args()
+
+    kernels.set_backend("numpy")
+    has_numba = kernels._load_numba()
+    if not has_numba:
+        print("numba is not installed: timing the NumPy backend only")
+    print(f"frames={args.frames} blocks={args.blocks}: us per block")
+    print(f"  {'kernel':<8} {'numpy':>10} {'numba':>10}  identical")
+    for name, run in RUNS.items():
+        row = [name]
+        outs = []
+        for backend in ("numpy", "numba") if has_numba else ("numpy",):
+            kernels.set_backend(backend)
+            run(args.frames, 1, args.rows)          # build / compile outside the timing
+            t0 = time.perf_counter()
+            outs.append(run(args.frames, args.blocks, args.rows))
+            row.append(1e6 * (time.perf_counter() - t0) / args.blocks)
+        same = "-" if len(outs) < 2 else ("yes" if np.array_equal(outs[0], outs[1]) else "NO")
+        times = "".join(f" {t:10.1f}" for t in row[1:]) + ("" if has_numba else f" {'-':>10}")
+        print(f"  {name:<8}{times}  {same}")
+    kernels.set_backend("auto")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Note-on cost of a spectral instrument during a fast roll.
+
+    python -m benchmarks.bench_note_on [--partials 28] [--notes 64] [--envelope adsr|peak]
+
+Times `note_on` alone (voices come from the pool and are recycled once their
+release ends), and the first note-ons after a cold pool of size 0.
+"""
+import argparse
+import time
+import numpy as np
+
+from instruments.additive import make_spectral_frequency, PartialCharacteristics
+from instruments.envelopes.adsr import ADSR
+from instruments.envelopes.peak import PeakEnvelope
+
+
+def partials(P: int, envelope: str):
+    rng = np.random.default_rng(0)
+    env = (lambda: ADSR(0.002, 0.5, 0.1, 0.3)) if envelope == "adsr" else (lambda: PeakEnvelope(0.002, 0.3))
+    return {float(r): PartialCharacteristics(float(a), 0.0, env())
+            for r, a in zip(rng.uniform(1.0, 12.0, P), rng.uniform(0.1, 1.0, P))}
+
+
+def roll(inst, notes: int, rounds: int = 5) -> float:
+    """Best per-note note_on time over `rounds` rolls (each followed by a full release)."""
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for i in range(notes):
+            inst.note_on(110.0 + 5.0 * i, 100, note=i)
+        best = min(best, (time.perf_counter() - t0) / notes)
+        for i in range(notes):
+            inst.note_off(0.0, note=i)
+        while inst.num_active_voices():
+            inst.render(256, 44100)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--partials", type=int, default=28)
+    ap.add_argument("--notes", type=int, default=64)
+    ap.add_argument("--envelope", choices=("adsr", "peak"), default="adsr")
+    args = ap.parse_args()
+
+    p = partials(args.partials, args.envelope)
+    print(f"partials={args.partials} notes={args.notes} envelope={args.envelope}: us per note_on")
+    cold = make_spectral_frequency(p, pool_size=0)
+    t0 = time.perf_counter()
+    for i in range(args.notes):
+        cold.note_on(110.0 + 5.0 * i, 100, note=i)
+    print(f"  empty pool (voices built)   {1e6 * (time.perf_counter() - t0) / args.notes:8.1f}")
+    print(f"  pooled voices               {1e6 * roll(make_spectral_frequency(p), args.notes):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Stress test: how much polyphony and event traffic the engine sustains per block size.
+
+    python -m benchmarks.bench_stress [--blocksizes 128 256 512] [--step 2.0]
+                                      [--notes 8] [--chord 3] [--cc 20] [--hold 0.3]
+                                      [--max-level 16] [--out stress.json]
+
+Runs a real AudioEngine on a real-time NullBackend, with a Mixer holding the
+predefined instruments (piano, steel drum, clock bell, chime, gong on channels
+0-4). A generator thread floods the bus with chords, their note-offs after
+`--hold` seconds, and CC messages. At level k it sends k * `--notes` chords
+and k * `--cc` CCs per second. Levels ramp up every `--step` seconds until
+the callback misses its block budget: its p99 time exceeds the block
+duration, or more than `--xrun-tolerance` of the blocks overrun.
+
+Per block size and level, the output has:
+- callback time percentiles;
+- overruns;
+- peak voice count;
+- events posted, dropped (bus full) and still queued.
+It also gives the last sustained level and the breaking point. The output is
+JSON on stdout (or in `--out`); engine messages go to stderr.
+"""
+import argparse
+import contextlib
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+import numpy as np
+
+from audio.backends import NullBackend
+from audio.engine import AudioEngine
+from audio.mixer import Mixer
+from instruments.midi import MidiInstrumentAdapter
+from instruments.predefined.additive.drums import (make_steel_drum, make_clock_bell,
+                                                   make_high_metallic_chime, make_small_gong)
+from instruments.predefined.additive.pianos import make_piano
+from midi.messages import NOTE_ON, NOTE_OFF, CONTROL_CHANGE
+from routing.bus import EventBus
+
+INSTRUMENTS = (make_piano, make_steel_drum, make_clock_bell, make_high_metallic_chime, make_small_gong)
+
+
+class TimedNullBackend(NullBackend):
+    """NullBackend recording the duration of every callback."""
+    def __init__(self, capacity: int = 1 << 20):
+        super().__init__(realtime=True)
+        self.times = np.zeros(capacity)
+        self.count = 0
+
+    def open(self, callback, sr, blocksize, channels):
+        def timed(outdata, frames, time_info, status):
+            t0 = time.perf_counter()
+            callback(outdata, frames, time_info, status)
+            if self.count < self.times.shape[0]:
+                self.times[self.count] = time.perf_counter() - t0
+                self.count += 1
+        super().open(timed, sr, blocksize, channels)
+
+
+def build_mixer() -> Mixer:
+    mixer = Mixer()
+    for ch, make in enumerate(INSTRUMENTS):
+        mixer.add_track(ch, MidiInstrumentAdapter(make(master=0.3, velocity_curve=1.5)), gain=0.5)
+    return mixer
+
+
+class LoadGenerator:
+    """Posts chords, their note-offs and CCs on the bus at a rate set by `level`."""
+    def __init__(self, bus: EventBus, args, tracks: int):
+        self.bus = bus
+        self.args = args
+        self.tracks = tracks
+        self.level = 0
+        self.posted = 0
+        self.dropped = 0
+        self._rng = random.Random(0)
+        self._held: deque = deque()         # (release time, channel, note)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LoadGenerator", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
+    def _post(self, kind: int, ch: int, d1: int, d2: int) -> None:
+        try:
+            self.bus.post_raw(kind, ch, d1, d2)
+            self.posted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        a, rng = self.args, self._rng
+        tick = 0.005
+        chords = ccs = 0.0
+        next_t = time.perf_counter()
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            chords += a.notes * self.level * tick
+            ccs += a.cc * self.level * tick
+            while chords >= 1.0:
+                chords -= 1.0
+                ch = rng.randrange(self.tracks)
+                root = rng.randrange(36, 84)
+                for k in range(a.chord):
+                    note = root + (0, 4, 7, 11, 14, 17)[k % 6] + 12 * (k // 6)
+                    self._post(NOTE_ON, ch, note, rng.randrange(40, 128))
+                    self._held.append((now + a.hold, ch, note))
+            while self._held and self._held[0][0] <= now:
+                _, ch, note = self._held.popleft()
+                self._post(NOTE_OFF, ch, note, 0)
+            while ccs >= 1.0:
+                ccs -= 1.0
+                self._post(CONTROL_CHANGE, rng.randrange(self.tracks), rng.choice((1, 74)), rng.randrange(128))
+            next_t += tick
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.perf_counter()
+
+
+def run_blocksize(blocksize: int, args) -> dict:
+    mixer = build_mixer()
+    bus = EventBus(maxsize=args.bus_size)
+    backend = TimedNullBackend()
+    engine = AudioEngine(mixer, bus, sr=args.sr, blocksize=blocksize, channels=2,
+                         meter_period=3600.0, backend=backend)
+    gen = LoadGenerator(bus, args, len(INSTRUMENTS))
+    budget = blocksize / float(args.sr)
+    levels = []
+    breaking = None
+
+    engine.start()
+    gen.start()
+    try:
+        for level in range(1, args.max_level + 1):
+            gen.level = level
+            i0, posted0, dropped0 = backend.count, gen.posted, gen.dropped
+            voices = 0
+            end = time.perf_counter() + args.step
+            while time.perf_counter() < end:
+                time.sleep(0.05)
+                voices = max(voices, int(mixer.meters.read()["voices"].sum()))
+            t = backend.times[i0:backend.count]
+            if t.size == 0:
+                continue
+            overruns = int(np.count_nonzero(t > budget))
+            p50, p90, p99 = np.percentile(t, (50, 90, 99))
+            r = {
+                "level": level,
+                "chords_per_sec": args.notes * level,
+                "notes_per_sec": args.notes * args.chord * level,
+                "cc_per_sec": args.cc * level,
+                "blocks": int(t.size),
+                "callback_ms": {"p50": 1e3 * p50, "p90": 1e3 * p90, "p99": 1e3 * p99,
+                                "max": 1e3 * float(t.max())},
+                "load": float(t.mean()) / budget,
+                "overruns": overruns,
+                "max_voices": voices,
+                "events_posted": gen.posted - posted0,
+                "events_dropped": gen.dropped - dropped0,
+                "events_queued": len(bus.q),
+            }
+            levels.append(r)
+            print(f"[Stress] blocksize {blocksize} level {level}: p99 {r['callback_ms']['p99']:.2f} ms "
+                  f"/ {1e3 * budget:.2f} ms, {overruns} overruns, {voices} voices", file=sys.stderr)
+            if p99 > budget or overruns > args.xrun_tolerance * t.size:
+                breaking = r
+                break
+    finally:
+        gen.stop()
+        engine.stop()
+
+    sustained = [r for r in levels if r is not breaking]
+    return {
+        "blocksize": blocksize,
+        "budget_ms": 1e3 * budget,
+        "max_sustained": sustained[-1] if sustained else None,
+        "breaking_point": breaking,
+        "levels": levels,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--blocksizes", type=int, nargs="+", default=[128, 256, 512])
+    ap.add_argument("--sr", type=int, default=44100)
+    ap.add_argument("--step", type=float, default=2.0, help="seconds per load level")
+    ap.add_argument("--max-level", type=int, default=16)
+    ap.add_argument("--notes", type=float, default=8.0, help="chords per second at level 1")
+    ap.add_argument("--chord", type=int, default=3, help="notes per chord")
+    ap.add_argument("--cc", type=float, default=20.0, help="CC messages per second at level 1")
+    ap.add_argument("--hold", type=float, default=0.3, help="seconds before each note-off")
+    ap.add_argument("--bus-size", type=int, default=1024)
+    ap.add_argument("--xrun-tolerance", type=float, default=0.01, help="fraction of overrunning blocks")
+    ap.add_argument("--out", default=None, help="JSON file (default: stdout)")
+    args = ap.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        results = [run_blocksize(bs, args) for bs in args.blocksizes]
+    report = {
+        "sr": args.sr,
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "blocksizes")},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
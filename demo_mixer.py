@@ -7,7 +7,8 @@ import time
 
 from instruments.additive import make_spectral_frequency, PartialCharacteristics
 from instruments.envelopes.adsr import ADSR
-from instruments.midi import midi_to_freq_equal_tempered, MidiInstrumentAdapter
+from instruments.midi import MidiInstrumentAdapter
+from instruments.tuning import TuningTable
 
 SR = 44100
 BLOCK = 256
@@ -25,7 +26,7 @@ partials_lead = {
 
 lead = make_spectral_frequency(partials=partials_lead, master=0.8, velocity_curve=1.6)
 
-midi_to_freq = lambda note: midi_to_freq_equal_tempered(note, n_tones=12)
+midi_to_freq = TuningTable.equal_tempered(n_tones=12)
 lead = MidiInstrumentAdapter(lead, midi_to_freq)
 
 
@@ -65,6 +66,9 @@ seq_lead = StepSequencer(bus, steps_lead, steps_per_beat=4, channel=1)
 clock = Clock(bpm=60, ppq=24)
 clock.start(lambda: (seq_bass.on_tick(ppq=24), seq_lead.on_tick(ppq=24)))
 
+# The bass loop never changes: play it back from a buffer after one cycle
+mixer.freeze(0, seq_bass, clock=clock, ppq=24, sr=SR)
+
 print("Mixer demo running. Ctrl+C to quit.")
 try:
     while True: time.sleep(1)
@@ -1,12 +1,18 @@
 import numpy as np
-from typing import Dict, Callable, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, Callable, List, Optional, Tuple
+from dataclasses import dataclass, field
 from . signals.compose import SpectralStack
+from . signals.ifft import IFFTSynth
 from . envelopes.base import Envelope
 from . envelopes.adsr import ADSR
+from . envelopes.groups import envelope_array
+from . envelopes.control import ControlGrid, control_points
 from . base import Voice, FrequencyInstrument
+from . voices import VoiceTable, VoiceSlot
+from midi.messages import NOTE_ON, NOTE_OFF, CONTROL_CHANGE, PITCH_BEND
 import threading
 import copy
+from collections import deque
 
 @dataclass
 class AdditiveFreqVoice(Voice):
@@ -21,6 +27,11 @@ class AdditiveFreqVoice(Voice):
     def finished(self) -> bool:
         return self.env.finished()
 
+    def set_pitch(self, ratio: float, glide: bool = True) -> None:
+        self.signal.target_pitch = float(ratio)
+        if not glide:
+            self.signal.pitch = self.signal.target_pitch
+
     def render(self, frames: int, sr: int) -> np.ndarray:
         raw = self.signal.render(self.freq, frames, sr)
         env = self.env.render(frames, sr)
@@ -73,53 +84,120 @@ class PolyFrequencyInstrument(FrequencyInstrument):
     """
     Keeps multiple voices per note to avoid clicks on retrigger.
     Sustain pedal supported. 
+    Pitch bend (per channel) and tuning offsets (per note) only retarget the voices'
+    pitch multipliers: oscillators glide to them over the next block.
     1/sqrt(N) gain comp + master, where N = nb of voices
+    Optional per-voice filter: a BiquadBank (audio.filterbank) holding one slot per
+    voice, run over all voices in one batched call per block; CC 74 sets its cutoff.
     """
 
     def __init__(self, voice_factory: Callable[[int, int], Voice], 
-                 master: float = 0.6, alpha: float = 0.05):
+                 master: float = 0.6, alpha: float = 0.05,
+                 voice_filter=None):
         self._vf = voice_factory
-        # store (note, voice, pending_release_flag)
-        self._voices: List[Tuple[int, Voice, bool]] = []
+        self._recycle = getattr(voice_factory, "recycle", None)   # pooled factories take voices back
+        # voices indexed by (note, channel), with held/sustained/releasing state
+        self._voices = VoiceTable()
         self._lock = threading.Lock()
         self._sustain = False
         self.master = float(master)
         self._last_gain = self.master
         self.alpha = alpha
-        self._pending_release: set[float] = set()
+        self.voice_filter = voice_filter
+        self._bend: Dict[int, float] = {}                   # channel -> frequency ratio
+        self._offsets: Dict[Tuple[float, int], float] = {}  # key -> frequency ratio
+
+    @staticmethod
+    def _key(freq_hz: float, note: Optional[int], channel: int) -> Tuple[float, int]:
+        # frequency-only callers are keyed by the exact frequency they pass
+        return (int(note) if note is not None else float(freq_hz), int(channel))
 
-    def note_on(self, freq_hz: int, velocity: int) -> None:
+    def note_on(self, freq_hz: float, velocity: int,
+                note: Optional[int] = None, channel: int = 0) -> None:
         v = self._vf(float(freq_hz), int(velocity))
-            
         with self._lock:
-            self._voices.append((freq_hz, v, False))
-            self._pending_release.discard(freq_hz)
-            
+            self._add(self._key(freq_hz, note, channel), v)
 
-    def note_off(self, freq_hz: float) -> None:
-        f = float(freq_hz)
+    def note_off(self, freq_hz: float, note: Optional[int] = None, channel: int = 0) -> None:
         with self._lock:
-            for i, (freq, v, pending) in enumerate(self._voices):
-                if abs(freq - f) < 1e-6 and not pending:
-                    if self._sustain:
-                        self._voices[i] = (freq, v, True)
-                    else:
-                        v.note_off()
-      
+            self._voices.release(self._key(freq_hz, note, channel), self._sustain)
 
     def cc(self, control: int, value: int) -> None:
+        with self._lock:
+            self._cc(control, value)
+
+    def pitch_bend(self, semitones: float, channel: int = 0) -> None:
+        with self._lock:
+            self._pitch_bend(semitones, int(channel))
+
+    def handle_events(self, batch: np.ndarray, freqs: np.ndarray,
+                      bend_range: float = 2.0, channel: int = 0) -> None:
+        """
+        Batch entry point: all events of `batch` (midi.messages.EVENT_DTYPE), in order,
+        under one lock acquisition. `freqs` holds each note event's frequency; bends are
+        scaled to +-`bend_range` semitones. New voices are built before taking the lock.
+        """
+        kinds = batch["type"].tolist()
+        notes = batch["data1"].tolist()
+        values = batch["data2"].tolist()
+        freqs = np.asarray(freqs).tolist()
+        new = [self._vf(f, v) if k == NOTE_ON else None
+               for k, f, v in zip(kinds, freqs, values)]
+        with self._lock:
+            for kind, note, value, v in zip(kinds, notes, values, new):
+                if kind == NOTE_ON:
+                    self._add((note, channel), v)
+                elif kind == NOTE_OFF:
+                    self._voices.release((note, channel), self._sustain)
+                elif kind == CONTROL_CHANGE:
+                    self._cc(note, value)
+                elif kind == PITCH_BEND:
+                    self._pitch_bend(bend_range * note / 8192.0, channel)
+
+    # --- event handlers, called with the lock held ---
+    def _add(self, key: Tuple[float, int], v: Voice) -> None:
+        pitch = self._pitch(key)
+        if pitch != 1.0:
+            v.set_pitch(pitch, glide=False)
+        slot = self.voice_filter.allocate() if self.voice_filter is not None else -1
+        self._voices.add(key, v, slot)
+
+    def _retire(self, dead: List[VoiceSlot]) -> None:
+        self._voices.remove(dead)
+        if self._recycle is not None:
+            for sl in dead:
+                self._recycle(sl.voice)
+
+    def _cc(self, control: int, value: int) -> None:
+        if control == 74 and self.voice_filter is not None:  # brightness -> cutoff, 20 Hz..20 kHz
+            self.voice_filter.set_cutoff(20.0 * 1000.0 ** (max(0, min(127, int(value))) / 127.0))
+            return
         if control != 64:  # sustain
             return
         pedal = value >= 64
+        if self._sustain and not pedal:
+            self._voices.release_sustained()
+        self._sustain = pedal
+
+    def _pitch(self, key: Tuple[float, int]) -> float:
+        return self._bend.get(key[1], 1.0) * self._offsets.get(key, 1.0)
+
+    def _pitch_bend(self, semitones: float, channel: int) -> None:
+        self._bend[channel] = 2.0 ** (float(semitones) / 12.0)
+        for sl in self._voices:
+            if sl.key[1] == channel:
+                sl.voice.set_pitch(self._pitch(sl.key))
+
+    def set_note_offset(self, note: int, cents: float, channel: int = 0) -> None:
+        """Retune one note by `cents` (0 clears), including the voices already sounding."""
+        key = self._key(0.0, note, channel)
         with self._lock:
-            if self._sustain and not pedal:
-                for f in list(self._pending_release):
-                    v = self._voices.get(f)
-                    if v is not None:
-                        v.note_off()    
-                self._pending_release.clear()
-            self._sustain = pedal
-
+            if cents:
+                self._offsets[key] = 2.0 ** (float(cents) / 1200.0)
+            else:
+                self._offsets.pop(key, None)
+            for sl in self._voices.voices_of(key):
+                sl.voice.set_pitch(self._pitch(key))
 
 
     def _smoothing_gain(self, target_gain):
@@ -134,13 +212,26 @@ class PolyFrequencyInstrument(FrequencyInstrument):
             mix = np.zeros(frames, dtype=np.float32)
             n_start = max(1, len(self._voices))
             
-            alive: List[Tuple[float, Voice, bool]] = []
-
-            for freq, v, pending in self._voices:
-                mix += v.render(frames, sr)
-                if not v.finished():
-                    alive.append((freq, v, pending))
-            self._voices = alive
+            dead: List[VoiceSlot] = []
+
+            if self.voice_filter is None:
+                for sl in self._voices:
+                    mix += sl.voice.render(frames, sr)
+                    if sl.voice.finished():
+                        dead.append(sl)
+            elif len(self._voices):
+                # one row per voice, filtered together, then summed
+                rows = np.empty((len(self._voices), frames), dtype=np.float32)
+                slots = np.empty(len(self._voices), dtype=np.intp)
+                for i, sl in enumerate(self._voices):
+                    rows[i] = sl.voice.render(frames, sr)
+                    slots[i] = sl.filter_slot
+                    if sl.voice.finished():
+                        dead.append(sl)
+                        self.voice_filter.release(sl.filter_slot)
+                self.voice_filter.process(rows, slots, sr)
+                mix += rows.sum(axis=0)
+            self._retire(dead)
             
             #gain = self._smoothing_gain(self.master / np.sqrt(n_start))
             gain = self.master
@@ -154,6 +245,40 @@ class PolyFrequencyInstrument(FrequencyInstrument):
 
 
 
+class IFFTPolyInstrument(PolyFrequencyInstrument):
+    """
+    PolyFrequencyInstrument rendered by one shared IFFTSynth: every voice writes its
+    partials into the same spectrum each frame (voices provide `frame_partials`),
+    so the cost is about one FFT per hop whatever the number of partials.
+    """
+
+    def __init__(self, voice_factory: Callable[[int, int], Voice],
+                 master: float = 0.6, alpha: float = 0.05, hop: int = 256):
+        super().__init__(voice_factory, master=master, alpha=alpha)
+        self._synth = IFFTSynth(hop=hop)
+
+    def _frame(self, hop: int, sr: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        freqs, amps, phases = [], [], []
+        dead: List[VoiceSlot] = []
+        for sl in self._voices:
+            f, a, ph = sl.voice.frame_partials(hop, sr)
+            freqs.append(f); amps.append(a); phases.append(ph)
+            if sl.voice.finished():
+                dead.append(sl)
+        self._retire(dead)
+        if not freqs:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        return np.concatenate(freqs), np.concatenate(amps), np.concatenate(phases)
+
+    def render(self, frames: int, sr: int) -> np.ndarray:
+        with self._lock:
+            mix = self._synth.render(frames, sr, self._frame)
+            mix *= self.master
+            self._last_gain = self.master
+            return mix
+
+
+
 @dataclass
 class PartialCharacteristics:
     amplitude: float
@@ -168,30 +293,93 @@ class SpectralVoice(Voice):
     bank: SpectralStack                   # oscillator bank (amp+phase only)
     partial_envs: Dict[float, Envelope]   # key: ratio -> envelope
     vel_amp: float = 1.0
+    env_array: Optional[object] = None    # ADSRArray/PeakArray/EnvelopeGroups, in bank order (replaces partial_envs)
+    grid: Optional[ControlGrid] = None    # control-rate envelope evaluation (None: audio rate)
+    _env_last: Optional[np.ndarray] = field(default=None, repr=False)
 
     def note_off(self) -> None:
+        if self.env_array is not None:
+            self.env_array.gate_off()
         for env in self.partial_envs.values():
             env.gate_off()
     
     def finished(self) -> bool:
         # voice ends when all partial envelopes finished
+        if self.env_array is not None:
+            return self.env_array.finished()
         return not self.partial_envs or all(e.finished() for e in self.partial_envs.values())
 
+    def set_pitch(self, ratio: float, glide: bool = True) -> None:
+        self.bank.target_pitch = float(ratio)
+        if not glide:
+            self.bank.pitch = self.bank.target_pitch
+
+    def restart(self, freq_hz: float, vel_amp: float) -> None:
+        """Reuse this voice for a new note: reset phases and envelopes, keep the arrays."""
+        self.freq = float(freq_hz)
+        self.vel_amp = float(vel_amp)
+        self.bank.reset()
+        if self.env_array is not None:
+            self.env_array.gate_on()
+        for env in self.partial_envs.values():
+            env.gate_on()
+        if self._env_last is not None:
+            self._env_last[:] = 0.0
+
+    def _envelopes(self, frames: int, sr: int) -> Optional[np.ndarray]:
+        """(P, frames) envelope matrix in bank order, or None for the per-partial path."""
+        if self.env_array is not None:
+            return self.env_array.render(frames, sr, self.grid)
+        if self.grid is None:
+            return None
+        envs = [self.partial_envs.get(r) for r in self.bank.ratios]
+        if any(e is None for e in envs):
+            return None
+        if self._env_last is None:
+            self._env_last = np.zeros(len(envs))
+        return self.grid.expand(control_points(envs, self._env_last, frames, sr, self.grid), frames)
+
     def render(self, frames: int, sr: int) -> np.ndarray:
         Y, ratios = self.bank.render_partials(self.freq, frames, sr)   # shape (P, frames)
+        E = self._envelopes(frames, sr)   # advance envelopes even if nothing is audible
         if Y.size == 0:
             return np.zeros(frames, dtype=np.float32)
 
-        # apply per-partial envelopes
-        for i, r in enumerate(ratios):
-            env = self.partial_envs.get(r)
-            if env is None:
-                # if no specific envelope provided, treat as constant 1
-                continue
-            Y[i, :] *= env.render(frames, sr)
+        if E is not None:
+            # applied only to partials under Nyquist
+            Y *= E[self.bank.last_active]
+        else:
+            # apply per-partial envelopes
+            for i, r in enumerate(ratios):
+                env = self.partial_envs.get(r)
+                if env is None:
+                    # if no specific envelope provided, treat as constant 1
+                    continue
+                Y[i, :] *= env.render(frames, sr)
 
         out = Y.sum(axis=0).astype(np.float32)
         return out * float(self.vel_amp)
+
+    def frame_partials(self, hop: int, sr: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        IFFT backend: (freqs, amps, phases) at the center of the next frame, `hop`
+        samples ahead. Envelopes are advanced once per frame, phases by one hop.
+        """
+        bank = self.bank
+        bank.pitch = bank.target_pitch          # pitch changes are held per frame here
+        freqs = bank.ratios * (self.freq * bank.pitch)
+        phases = bank.phases
+        bank.phases = (phases + (2.0 * np.pi * hop / sr) * freqs) % (2.0 * np.pi)
+
+        if self.env_array is not None:
+            levels = self.env_array.advance(hop, sr)
+        else:
+            levels = np.ones(bank.ratios.size)
+            for i, r in enumerate(bank.ratios):
+                env = self.partial_envs.get(r)
+                if env is not None:
+                    levels[i] = env.advance(hop, sr)
+        return freqs, bank.amps * levels * float(self.vel_amp), phases
     
 
 
@@ -207,34 +395,105 @@ def _clone_env(e: Envelope) -> Envelope:
     
 
 
+@dataclass(frozen=True)
+class SpectralSpec:
+    """
+    Immutable part of a spectral instrument, compiled once from its partials, in
+    bank order (sorted ratios): ratios, L1-normalized amplitudes, initial phases
+    and envelope prototypes.
+    """
+    ratios: np.ndarray
+    amps: np.ndarray
+    phi0: np.ndarray
+    envs: Tuple[Envelope, ...]
+
+    @classmethod
+    def compile(cls, partials: Dict[float, PartialCharacteristics]) -> "SpectralSpec":
+        order = sorted(partials)
+        ratios = np.array(order, dtype=np.float64)
+        amps = np.array([partials[r].amplitude for r in order], dtype=np.float64)
+        if amps.size:
+            amps /= float(np.sum(np.abs(amps)))
+        phi0 = np.array([partials[r].phase for r in order], dtype=np.float64)
+        envs = tuple(partials[r].env for r in order)
+        for a in (ratios, amps, phi0):
+            a.flags.writeable = False
+        return cls(ratios, amps, phi0, envs)
+
+    def __len__(self) -> int:
+        return self.ratios.shape[0]
+
+
+class SpectralVoiceFactory:
+    """
+    SpectralVoices for one SpectralSpec, from a pool. `__call__` takes a free voice
+    and restarts it (or builds one when the pool is empty); the instrument gives
+    finished voices back through `recycle`. The free list is a deque: taking and
+    returning voices from different threads needs no lock.
+    """
+    def __init__(self, spec: SpectralSpec, velocity_curve: float = 1.8,
+                 control_step: int = 32, pool_size: int = 16):
+        self.spec = spec
+        self.velocity_curve = float(velocity_curve)
+        self.control_step = int(control_step)
+        self._free: deque = deque(self._build() for _ in range(max(0, int(pool_size))))
+
+    def _build(self) -> SpectralVoice:
+        spec = self.spec
+        bank = SpectralStack.from_arrays(spec.ratios, spec.amps, spec.phi0)
+        grid = ControlGrid(self.control_step) if self.control_step > 1 else None
+        env_array = envelope_array(spec.envs)    # ADSR and peak partials: closed form
+        partial_envs: Dict[float, Envelope] = {}
+        if env_array is None:
+            # fresh envelope instances, once per pooled voice
+            partial_envs = {float(r): _clone_env(e) for r, e in zip(spec.ratios, spec.envs)}
+        return SpectralVoice(freq=0.0, bank=bank, partial_envs=partial_envs,
+                             env_array=env_array, grid=grid)
+
+    def __call__(self, freq_hz: float, velocity: int) -> SpectralVoice:
+        try:
+            v = self._free.pop()
+        except IndexError:
+            v = self._build()
+        vel = max(0, min(127, int(velocity))) / 127.0
+        v.restart(freq_hz, vel ** self.velocity_curve)
+        return v
+
+    def recycle(self, voice: SpectralVoice) -> None:
+        self._free.append(voice)
+
+
+
 def make_spectral_frequency(
     partials: Dict[float, PartialCharacteristics],   # ratio -> characteristics
     master: float = 0.6,
     velocity_curve: float = 1.8,
+    voice_filter=None,
+    backend: str = "stack",
+    hop: int = 256,
+    control_step: int = 32,
+    pool_size: int = 16,
 ) -> FrequencyInstrument:
-    
-    #partials_sorted = dict(sorted(partials.items(), key=lambda kv: kv[0]))
-    partials_sorted = dict([ (r, (ch.amplitude, ch.phase)) for r, ch in partials.items() ])
-
-    def voice_factory(freq_hz: float, velocity: int) -> SpectralVoice:
-        # IMPORTANT: fresh oscillator bank per voice
-        bank = SpectralStack(partials_sorted)
-
-        # /!\ IMPORTANT: fresh envelope instances per voice
-        partial_envs: Dict[float, Envelope] = {}
-        if partials:
-            for ratio, characteristic in partials.items():
-                e = _clone_env(characteristic.env)
-                e.gate_on()
-                partial_envs[float(ratio)] = e
-
-        # velocity mapping
-        v = max(0, min(127, int(velocity))) / 127.0
-        vel_amp = v ** float(velocity_curve)
-
-        return SpectralVoice(freq=float(freq_hz), 
-                             bank=bank, 
-                             partial_envs=partial_envs, 
-                             vel_amp=vel_amp)
-
-    return PolyFrequencyInstrument(voice_factory=voice_factory, master=master)
\ No newline at end of file
+    """
+    Additive instrument with one envelope per partial.
+    Envelopes are evaluated every `control_step` samples and linearly interpolated
+    (0 or 1: audio rate); ADSR and PeakEnvelope partials are evaluated together,
+    in closed form.
+    backend="stack": each voice renders its partials with a SpectralStack (cost ~ partials x frames).
+    backend="ifft": all voices are synthesized together by inverse FFT every `hop` samples,
+    with envelopes sampled at frame rate; preferable for many partials.
+    The partials are compiled once (SpectralSpec) and voices are recycled through a
+    pool of `pool_size` preallocated voices (grown on demand), so a note-on only
+    resets phases and envelope stages.
+    """
+    if backend not in ("stack", "ifft"):
+        raise ValueError(f"Unknown additive backend '{backend}', expected 'stack' or 'ifft'.")
+    if backend == "ifft" and voice_filter is not None:
+        raise ValueError("The ifft backend does not support a per-voice filter.")
+
+    voice_factory = SpectralVoiceFactory(SpectralSpec.compile(partials), velocity_curve,
+                                         control_step=control_step, pool_size=pool_size)
+    if backend == "ifft":
+        return IFFTPolyInstrument(voice_factory=voice_factory, master=master, hop=hop)
+    return PolyFrequencyInstrument(voice_factory=voice_factory, master=master,
+                                   voice_filter=voice_filter)
\ No newline at end of file
@@ -1,15 +1,24 @@
-from typing import Protocol
+from typing import Optional, Protocol
 import numpy as np
 
 class Voice(Protocol):
     def note_off(self) -> None: ...
     def finished(self) -> bool: ...
     def render(self, frames: int, sr: int) -> np.ndarray: ...
+    # frequency multiplier (pitch bend x tuning offset), reached over the next block if glide
+    def set_pitch(self, ratio: float, glide: bool = True) -> None: ...
 
 class FrequencyInstrument(Protocol):
-    def note_on(self, freq_hz: float, velocity: int) -> None: ...
-    def note_off(self, freq_hz: float) -> None: ...
+    # `note`/`channel` (when known) identify the key, so note_off needs no frequency match
+    def note_on(self, freq_hz: float, velocity: int,
+                note: Optional[int] = None, channel: int = 0) -> None: ...
+    def note_off(self, freq_hz: float, note: Optional[int] = None, channel: int = 0) -> None: ...
     def cc(self, control: int, value: int) -> None: ...
+    def pitch_bend(self, semitones: float, channel: int = 0) -> None: ...
+    def set_note_offset(self, note: int, cents: float, channel: int = 0) -> None: ...
+    # batch of midi.messages.EVENT_DTYPE records, with the frequency of each note event
+    def handle_events(self, batch: np.ndarray, freqs: np.ndarray,
+                      bend_range: float = 2.0, channel: int = 0) -> None: ...
     def render(self, frames: int, sr: int) -> np.ndarray: ...
     def num_active_voices(self) -> int: ...
 
@@ -17,5 +26,7 @@ class MidiInstrument(Protocol):
     def note_on(self, note: int, velocity: int) -> None: ...
     def note_off(self, note: int) -> None: ...
     def cc(self, control: int, value: int) -> None: ...
+    def pitch_bend(self, value: int) -> None: ...     # 14-bit, -8192..8191
+    def handle_events(self, batch: np.ndarray) -> None: ...   # midi.messages.EVENT_DTYPE
     def render(self, frames: int, sr: int) -> np.ndarray: ...
     def num_active_voices(self) -> int: ...
\ No newline at end of file
@@ -1,6 +1,9 @@
 import numpy as np
 from enum import Enum, auto
+from typing import Optional, Sequence
 from .base import Envelope
+from .control import ControlGrid
+import kernels
 
 class ADSRState(Enum):
     IDLE = auto()      # No sound
@@ -33,6 +36,7 @@ class ADSR(Envelope):
         # current output level (last sample written) and release start level
         self._y = 0.0
         self._rel_start = 0.0
+        kernels.prepare("adsr_render")
 
     # ---- control ----
     def gate_on(self) -> None:
@@ -93,6 +97,13 @@ class ADSR(Envelope):
         self._prepare_for_sr(sr)
         out = np.zeros(frames, dtype=np.float32)
 
+        k = kernels.jit("adsr_render")
+        if k is not None:
+            state, self._t, self._y = k(out, self._state.value, self._t, self._y, self._rel_start,
+                                        self._A, self._D, self._R, self.s, int(sr))
+            self._state = ADSRState(state)
+            return out
+
         idx = 0
         while idx < frames and self._state != ADSRState.IDLE:
             remain = frames - idx
@@ -159,3 +170,198 @@ class ADSR(Envelope):
 
         return out
 
+    def advance(self, frames: int, sr: int = 44100) -> float:
+        """
+        Same state progression as render(), without building the samples:
+        returns the level of the last sample (control-rate evaluation).
+        """
+        self._prepare_for_sr(sr)
+        idx = 0
+        while idx < frames and self._state != ADSRState.IDLE:
+            if self._state == ADSRState.SUSTAIN:
+                self._y = float(self.s)
+                break
+
+            if self._state == ADSRState.ATTACK:
+                L = self._A
+            elif self._state == ADSRState.DECAY:
+                L = self._D
+            else:
+                L = self._R
+            elapsed = int(self._t * sr)
+            n = min(frames - idx, max(0, L - elapsed))
+            if n:
+                i = elapsed + n - 1
+                if self._state == ADSRState.ATTACK:
+                    self._y = 1.0 if L <= 1 else i / (L - 1)
+                elif self._state == ADSRState.DECAY:
+                    self._y = self.s if L <= 1 else 1.0 + (self.s - 1.0) * i / (L - 1)
+                else:
+                    self._y = 0.0 if L <= 1 else self._rel_start * (1.0 - i / (L - 1))
+            self._t += n / sr
+            idx += n
+
+            if int(self._t * sr) >= L:
+                self._t = 0.0
+                if self._state == ADSRState.ATTACK:
+                    self._state = ADSRState.DECAY
+                    self._y = 1.0
+                elif self._state == ADSRState.DECAY:
+                    self._state = ADSRState.SUSTAIN
+                    self._y = float(self.s)
+                else:
+                    self._state = ADSRState.IDLE
+                    self._y = 0.0
+
+        return float(self._y)
+
+
+
+class ADSRArray:
+    """
+    P ADSR envelopes sharing one gate (the partials of a voice), evaluated together.
+
+    Stages are piecewise linear, so levels are computed in closed form from the
+    samples elapsed since gate on/off, for all partials at once. With a
+    ControlGrid, only the control points are evaluated and then interpolated;
+    partials with a stage change inside the block (attack peak, end of decay,
+    end of release) are evaluated at audio rate, so onsets and corners stay
+    sample-accurate.
+    """
+
+    def __init__(self, attack, decay, sustain, release):
+        self.a = np.asarray(attack, dtype=np.float64)
+        self.d = np.asarray(decay, dtype=np.float64)
+        self.s = np.asarray(sustain, dtype=np.float64)
+        self.r = np.asarray(release, dtype=np.float64)
+        self._last_sr = None
+        self._gated = False
+        self._released = False
+        self._t = 0                   # samples since gate on
+        self._u = 0                   # samples since gate off
+        self._rel = np.zeros_like(self.s)
+
+    @classmethod
+    def from_envelopes(cls, envs: Sequence[ADSR]) -> "ADSRArray":
+        return cls([e.a for e in envs], [e.d for e in envs], [e.s for e in envs], [e.r for e in envs])
+
+    def __len__(self) -> int:
+        return self.s.shape[0]
+
+    # ---- control ----
+    def gate_on(self) -> None:
+        self._gated = True
+        self._released = False
+        self._t = 0
+        self._u = 0
+
+    def gate_off(self) -> None:
+        if not self._gated or self._released:
+            return
+        if self._t > 0 and self._last_sr is not None:
+            self._rel = self._on_level(np.array([self._t - 1]))[:, 0]
+        else:
+            self._rel = np.zeros_like(self.s)
+        self._released = True
+        self._u = 0
+
+    def finished(self) -> bool:
+        if not self._gated:
+            return True
+        if not self._released:
+            return False
+        return self._last_sr is not None and self._u >= self._R_end
+
+    # ---- internals ----
+    def _prepare_for_sr(self, sr: int) -> None:
+        if self._last_sr == sr:
+            return
+        A = np.maximum(1, (self.a * sr).astype(np.int64))
+        D = np.maximum(1, (self.d * sr).astype(np.int64))
+        R = np.maximum(1, (self.r * sr).astype(np.int64))
+        s = self.s
+        # same stage lengths as ADSR: no attack if a == 0, no decay if a == d == 0,
+        # and a release only if r > 0
+        A1 = np.where(self.a > 0, A, 0)
+        D1 = np.where((self.a > 0) | (self.d > 0), D, 0)
+        R1 = np.where(self.r > 0, R, 0)
+        col = lambda x: np.asarray(x, dtype=np.float64)[:, None]
+        self._A1, self._AD1, self._R1 = col(A1), col(A1 + D1), col(R1)
+        self._att0 = col(np.where(A > 1, 0.0, 1.0))
+        self._att_k = col(np.where(A > 1, 1.0 / np.maximum(A - 1, 1), 0.0))
+        self._dec0 = col(np.where(D > 1, 1.0, s))
+        self._dec_k = col(np.where(D > 1, (s - 1.0) / np.maximum(D - 1, 1), 0.0))
+        self._rel_k = col(np.where(R > 1, 1.0 / np.maximum(R - 1, 1), 0.0))
+        self._s = col(s)
+        self._on_end = int(np.max(A1 + D1))        # all partials in sustain from here
+        self._R_end = int(np.max(R1))               # all partials silent from here
+        self._last_sr = sr
+
+    def _on_level(self, t: np.ndarray, rows=slice(None)) -> np.ndarray:
+        """Levels (P, len(t)) at sample t after gate on."""
+        A1 = self._A1[rows]
+        att = self._att0[rows] + t * self._att_k[rows]
+        dec = self._dec0[rows] + (t - A1) * self._dec_k[rows]
+        y = np.where(t < A1, att, np.where(t < self._AD1[rows], dec, self._s[rows]))
+        return np.where(t < 0, 0.0, y)
+
+    def _off_level(self, u: np.ndarray, rows=slice(None)) -> np.ndarray:
+        """Levels (P, len(u)) at sample u after gate off (u = -1: last held sample)."""
+        rel = self._rel[rows, None]
+        y = np.where(u < self._R1[rows], rel * (1.0 - u * self._rel_k[rows]), 0.0)
+        return np.where(u < 0, rel, y)
+
+    def levels(self, offsets: np.ndarray, rows=slice(None)) -> np.ndarray:
+        """Levels (P, len(offsets)) at sample offsets from the current position."""
+        if not self._gated:
+            return np.zeros((len(self.s[rows]), offsets.shape[0]))
+        if self._released:
+            return self._off_level(self._u + offsets, rows)
+        return self._on_level(self._t + offsets, rows)
+
+    def _corner_rows(self, frames: int) -> np.ndarray:
+        """Partials with a stage breakpoint within the next block."""
+        if self._released:
+            b, x = self._R1[:, 0], self._u
+            hit = (b >= x) & (b <= x + frames)
+        else:
+            x = self._t
+            hit = ((self._A1[:, 0] >= x) & (self._A1[:, 0] <= x + frames)) | \
+                  ((self._AD1[:, 0] >= x) & (self._AD1[:, 0] <= x + frames))
+        return np.nonzero(hit)[0]
+
+    def _step(self, frames: int) -> None:
+        if self._released:
+            self._u += frames
+        else:
+            self._t += frames
+
+    # ---- render ----
+    def render(self, frames: int, sr: int, grid: Optional[ControlGrid] = None) -> np.ndarray:
+        """
+        Envelope for the next block, advancing the state: shape (P, frames), or
+        (P, 1) while every partial holds a constant level (sustain, silence).
+        """
+        self._prepare_for_sr(sr)
+        if not self._gated:
+            E = np.zeros((len(self), 1))
+        elif not self._released and self._t >= self._on_end:
+            E = self._s
+        elif self._released and self._u > self._R_end:
+            E = np.zeros((len(self), 1))
+        elif grid is None or grid.step <= 1:
+            E = self.levels(np.arange(frames))
+        else:
+            E = grid.expand(self.levels(grid.offsets(frames)), frames)
+            rows = self._corner_rows(frames)
+            if rows.size:
+                E[rows] = self.levels(np.arange(frames), rows)
+        self._step(frames)
+        return E
+
+    def advance(self, frames: int, sr: int) -> np.ndarray:
+        """Advance by `frames` samples; levels (P,) of the last one."""
+        self._prepare_for_sr(sr)
+        y = self.levels(np.array([frames - 1]))[:, 0]
+        self._step(frames)
+        return y
@@ -1,5 +1,4 @@
 from typing import Protocol
-import matplotlib.pyplot as plt
 import numpy as np
 
 class Envelope(Protocol):
@@ -12,6 +11,11 @@ class Envelope(Protocol):
         """True if envelope is at rest and voice can be freed."""
         ...
 
+    def advance(self, frames: int, sr: int = 44100) -> float:
+        """Advance by `frames` samples and return the level reached (control-rate use)."""
+        y = self.render(frames, sr)
+        return float(y[-1]) if frames > 0 else 0.0
+
     def plot(self, t_total: float, t_gate_off: float, sr: int = 44100):
         """Plot from gate-on for `seconds` seconds, with optional gate-off at `t_gate_off`."""
         seconds = float(t_total)
@@ -47,6 +51,7 @@ class Envelope(Protocol):
             y[off_frame:] = self.render(frames_total - off_frame, sr)
     
         # ---- plot ----
+        import matplotlib.pyplot as plt     # optional, only needed to plot
         t = np.arange(frames_total) / sr
         fig, ax = plt.subplots(figsize=(8, 3))
         ax.plot(t, y, lw=1.2)
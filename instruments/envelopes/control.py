@@ -0,0 +1,80 @@
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+from .base import Envelope
+
+
+# layouts shared by every grid and voice, per (step, frames); bounded, so variable
+# block sizes (offline rendering, split blocks) never make it grow for good
+_LAYOUTS: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = {}
+_MAX_LAYOUTS = 256
+
+
+def _weights(n: int) -> np.ndarray:
+    """(2, n) weights of a segment's left and right points for its n samples."""
+    r = np.arange(1, n + 1) / n
+    return np.stack([1.0 - r, r])
+
+
+def _layout(step: int, frames: int) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """(offsets, segment weights, weights of a shorter last segment or None)."""
+    lay = _LAYOUTS.get((step, frames))
+    if lay is None:
+        if len(_LAYOUTS) >= _MAX_LAYOUTS:
+            _LAYOUTS.clear()
+        offsets = np.append(np.arange(-1, frames - 1, step), frames - 1)
+        last = frames - (offsets.shape[0] - 2) * step
+        lay = (offsets, _weights(step), _weights(last) if last != step else None)
+        _LAYOUTS[(step, frames)] = lay
+    return lay
+
+
+class ControlGrid:
+    """
+    Control points every `step` samples of a block, and their expansion to audio
+    rate by linear interpolation.
+
+    For a block of `frames` samples the points sit at offsets -1, step-1, 2*step-1,
+    ..., frames-1: the first one is the last sample of the previous block, the last
+    one the last sample of this block, so consecutive blocks join exactly. Each
+    segment is interpolated from its two neighbouring points only.
+    """
+    def __init__(self, step: int = 32):
+        self.step = max(1, int(step))
+
+    def offsets(self, frames: int) -> np.ndarray:
+        """Sample offsets of the control points within a block of `frames`."""
+        return _layout(self.step, frames)[0]
+
+    def expand(self, points: np.ndarray, frames: int) -> np.ndarray:
+        """Control values (..., n_points) -> audio-rate values (..., frames)."""
+        _, W, W_last = _layout(self.step, frames)
+        shape = points.shape[:-1]
+        # (left, right) point of every segment, then one (segments, 2) x (2, step) product
+        pairs = np.empty(shape + (points.shape[-1] - 1, 2))
+        pairs[..., 0] = points[..., :-1]
+        pairs[..., 1] = points[..., 1:]
+        if W_last is None:
+            return (pairs.reshape(-1, 2) @ W).reshape(shape + (frames,))
+        n = frames - W_last.shape[1]
+        out = np.empty(shape + (frames,))
+        out[..., :n] = (pairs[..., :-1, :].reshape(-1, 2) @ W).reshape(shape + (n,))
+        out[..., n:] = pairs[..., -1, :] @ W_last
+        return out
+
+
+def control_points(envs: Sequence[Envelope], last: np.ndarray, frames: int, sr: int,
+                   grid: ControlGrid) -> np.ndarray:
+    """
+    Generic control-rate evaluation through Envelope.advance, for envelopes without a
+    vectorized form. `last` holds each envelope's previous level and is updated.
+    Returns (len(envs), n_points) values at grid.offsets(frames).
+    """
+    offs = grid.offsets(frames)
+    steps = np.diff(offs)
+    pts = np.empty((len(envs), offs.shape[0]), dtype=np.float64)
+    pts[:, 0] = last
+    for i, env in enumerate(envs):
+        for k, n in enumerate(steps):
+            pts[i, k + 1] = env.advance(int(n), sr)
+    last[:] = pts[:, -1]
+    return pts
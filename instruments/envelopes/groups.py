@@ -0,0 +1,66 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from .base import Envelope
+from .adsr import ADSR, ADSRArray
+from .peak import PeakEnvelope, PeakArray
+from .control import ControlGrid
+
+# envelope type -> its vectorized form (from_envelopes)
+_ARRAYS = {ADSR: ADSRArray, PeakEnvelope: PeakArray}
+
+
+class EnvelopeGroups:
+    """
+    Partial envelopes of mixed types, one ADSRArray/PeakArray per type, behaving
+    as a single array in partial order.
+    """
+
+    def __init__(self, groups: Sequence[Tuple[np.ndarray, object]], size: int):
+        self.groups: List[Tuple[np.ndarray, object]] = list(groups)   # (rows, array)
+        self._size = int(size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def gate_on(self) -> None:
+        for _, arr in self.groups:
+            arr.gate_on()
+
+    def gate_off(self) -> None:
+        for _, arr in self.groups:
+            arr.gate_off()
+
+    def finished(self) -> bool:
+        return all(arr.finished() for _, arr in self.groups)
+
+    def render(self, frames: int, sr: int, grid: Optional[ControlGrid] = None) -> np.ndarray:
+        parts = [(rows, arr.render(frames, sr, grid)) for rows, arr in self.groups]
+        width = max(E.shape[1] for _, E in parts)     # 1 while every group is constant
+        out = np.empty((self._size, width))
+        for rows, E in parts:
+            out[rows] = E
+        return out
+
+    def advance(self, frames: int, sr: int) -> np.ndarray:
+        out = np.empty(self._size)
+        for rows, arr in self.groups:
+            out[rows] = arr.advance(frames, sr)
+        return out
+
+
+def envelope_array(envs: Sequence[Envelope]):
+    """
+    Vectorized form of `envs` (one envelope per partial, in order): an ADSRArray or
+    PeakArray when they share a type, EnvelopeGroups for a mix, or None if some
+    envelope has no vectorized form.
+    """
+    kinds = [type(e) for e in envs]
+    if not envs or any(k not in _ARRAYS for k in kinds):
+        return None
+    if len(set(kinds)) == 1:
+        return _ARRAYS[kinds[0]].from_envelopes(envs)
+    groups = []
+    for k in dict.fromkeys(kinds):
+        rows = np.array([i for i, ki in enumerate(kinds) if ki is k], dtype=np.intp)
+        groups.append((rows, _ARRAYS[k].from_envelopes([envs[i] for i in rows])))
+    return EnvelopeGroups(groups, len(envs))
@@ -1,6 +1,9 @@
 import numpy as np
 from enum import Enum, auto
+from typing import Optional, Sequence
 from .base import Envelope
+from .control import ControlGrid
+import kernels
 
 
 class PeakEnvelope(Envelope):
@@ -14,7 +17,7 @@ class PeakEnvelope(Envelope):
         self.a = float(attack)
         self.r = float(release)
         self._finished = True
-
+        kernels.prepare("peak_render")
 
     def gate_on(self) -> None:
         self._t = 0.0
@@ -36,27 +39,127 @@ class PeakEnvelope(Envelope):
         return 0.0
 
 
-    def render(self, frames: int, sr: int) -> np.ndarray:
-        out = np.zeros(frames, dtype=np.float32)
-        if self._finished or frames <= 0:
-            return out
-
-        dt = 1.0 / float(sr)
-        t = self._t
-
-        # Compute each sample by calling _math_render(t)
-        # TODO: Make it more optimal
-        for i in range(frames):
-            out[i] = self._math_render(t)
-            t += dt
-
-        # Advance internal time
-        self._t = t
+    def _levels(self, t: np.ndarray) -> np.ndarray:
+        """Vectorized _math_render."""
+        y = np.zeros(t.shape, dtype=np.float64)
+        if self.a > 0.0:
+            att = (t >= 0) & (t < self.a)
+            y[att] = t[att] / self.a
+        if self.r > 0.0:
+            rel = (t >= self.a) & (t < self.a + self.r)
+            y[rel] = 1.0 - (t[rel] - self.a) / self.r
+        return y
 
+    def _advance_time(self, frames: int, sr: int) -> None:
+        self._t += frames / float(sr)
         # Mark finished when past end of one-shot
         total = max(0.0, self.a) + max(0.0, self.r)
         if total == 0.0 or self._t >= total:
             self._finished = True
 
+    def render(self, frames: int, sr: int) -> np.ndarray:
+        if self._finished or frames <= 0:
+            return np.zeros(frames, dtype=np.float32)
+        k = kernels.jit("peak_render")
+        if k is not None:
+            out = np.empty(frames, dtype=np.float32)
+            k(out, self._t, self.a, self.r, float(sr))
+        else:
+            out = self._levels(self._t + np.arange(frames) / float(sr)).astype(np.float32)
+        self._advance_time(frames, sr)
         return out
 
+    def advance(self, frames: int, sr: int = 44100) -> float:
+        if self._finished or frames <= 0:
+            return 0.0
+        y = self._math_render(self._t + (frames - 1) / float(sr))
+        self._advance_time(frames, sr)
+        return float(y)
+
+
+
+class PeakArray:
+    """
+    P PeakEnvelopes triggered together (the partials of a voice), evaluated in
+    closed form for all partials at once. Same interface as ADSRArray; with a
+    ControlGrid, partials reaching their peak or their end inside the block are
+    evaluated at audio rate.
+    """
+
+    def __init__(self, attack, release):
+        self.a = np.asarray(attack, dtype=np.float64)
+        self.r = np.asarray(release, dtype=np.float64)
+        self._last_sr = None
+        self._gated = False
+        self._n = 0                   # samples since gate on
+
+    @classmethod
+    def from_envelopes(cls, envs: Sequence[PeakEnvelope]) -> "PeakArray":
+        return cls([e.a for e in envs], [e.r for e in envs])
+
+    def __len__(self) -> int:
+        return self.a.shape[0]
+
+    # ---- control ----
+    def gate_on(self) -> None:
+        self._gated = True
+        self._n = 0
+
+    def gate_off(self) -> None:
+        pass
+
+    def finished(self) -> bool:
+        if not self._gated:
+            return True
+        return self._last_sr is not None and self._n >= self._end
+
+    # ---- internals ----
+    def _prepare_for_sr(self, sr: int) -> None:
+        if self._last_sr == sr:
+            return
+        col = lambda x: np.asarray(x, dtype=np.float64)[:, None]
+        self._A = col(self.a * sr)                  # peak, in samples
+        self._AR = col((self.a + self.r) * sr)      # end, in samples
+        self._att_k = col(1.0 / np.where(self.a > 0, self.a * sr, 1.0))
+        self._rel_k = col(1.0 / np.where(self.r > 0, self.r * sr, 1.0))
+        self._end = float(np.max(self._AR)) if len(self) else 0.0
+        self._last_sr = sr
+
+    def levels(self, offsets: np.ndarray, rows=slice(None)) -> np.ndarray:
+        """Levels (P, len(offsets)) at sample offsets from the current position."""
+        if not self._gated:
+            return np.zeros((len(self.a[rows]), offsets.shape[0]))
+        n = self._n + offsets
+        A = self._A[rows]
+        att = n * self._att_k[rows]
+        rel = 1.0 - (n - A) * self._rel_k[rows]
+        return np.where(n < A, att, np.where(n < self._AR[rows], rel, 0.0))
+
+    def _corner_rows(self, frames: int) -> np.ndarray:
+        x = self._n
+        hit = ((self._A[:, 0] >= x) & (self._A[:, 0] <= x + frames)) | \
+              ((self._AR[:, 0] >= x) & (self._AR[:, 0] <= x + frames))
+        return np.nonzero(hit)[0]
+
+    # ---- render ----
+    def render(self, frames: int, sr: int, grid: Optional[ControlGrid] = None) -> np.ndarray:
+        """Envelope for the next block, advancing the state: (P, frames), or (P, 1) once silent."""
+        self._prepare_for_sr(sr)
+        if not self._gated or self._n > self._end:
+            E = np.zeros((len(self), 1))
+        elif grid is None or grid.step <= 1:
+            E = self.levels(np.arange(frames))
+        else:
+            E = grid.expand(self.levels(grid.offsets(frames)), frames)
+            rows = self._corner_rows(frames)
+            if rows.size:
+                E[rows] = self.levels(np.arange(frames), rows)
+        self._n += frames
+        return E
+
+    def advance(self, frames: int, sr: int) -> np.ndarray:
+        """Advance by `frames` samples; levels (P,) of the last one."""
+        self._prepare_for_sr(sr)
+        y = self.levels(np.array([frames - 1]))[:, 0]
+        self._n += frames
+        return y
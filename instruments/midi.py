@@ -1,6 +1,8 @@
 import numpy as np
 from typing import Callable
 from . base import MidiInstrument, FrequencyInstrument
+from . tuning import TuningTable
+from midi.messages import NOTE_ON
 
 
 def midi_to_freq_equal_tempered(note: int, 
@@ -13,17 +15,22 @@ def midi_to_freq_equal_tempered(note: int,
     return base_freq * (2 ** ((int(note) - int(base_note)) / n_tones))
 
 
+EQUAL_TEMPERED = TuningTable.equal_tempered()   # 12-TET, A4 = 440 Hz
+
+
 
 class MidiInstrumentAdapter(MidiInstrument):
     """
     Adapts any FrequencyInstrument to a MIDI-note API.
-    The MIDI→frequency mapping is configurable via midi_to_freq.
+    The MIDI→frequency mapping is configurable via midi_to_freq (a TuningTable,
+    or any note -> Hz function).
     """
 
     def __init__(
         self,
         inner_instrument: FrequencyInstrument,
-        midi_to_freq: Callable[[int], float] = midi_to_freq_equal_tempered
+        midi_to_freq: Callable[[int], float] = EQUAL_TEMPERED,
+        bend_range: float = 2.0
     ):
         """
         Parameters
@@ -33,21 +40,52 @@ class MidiInstrumentAdapter(MidiInstrument):
         midi_to_freq : Callable[[int], float]
             Function that converts MIDI note numbers to frequency (Hz).
             Default is standard equal-tempered A4=440 Hz.
+        bend_range : float
+            Pitch bend at full wheel deflection, in semitones.
         """
         self.inner_instrument = inner_instrument
         self._midi_to_freq = midi_to_freq
+        self.bend_range = float(bend_range)
 
-    def note_on(self, note: int, velocity: int) -> None:
+    def note_on(self, note: int, velocity: int, channel: int = 0) -> None:
         freq = self._midi_to_freq(note)
-        self.inner_instrument.note_on(freq, velocity)
+        self.inner_instrument.note_on(freq, velocity, note=int(note), channel=int(channel))
 
-    def note_off(self, note: int) -> None:
-        freq = self._midi_to_freq(note)
-        self.inner_instrument.note_off(freq)
+    def note_off(self, note: int, channel: int = 0) -> None:
+        # voices are found by (note, channel): no frequency needed
+        self.inner_instrument.note_off(0.0, note=int(note), channel=int(channel))
 
     def cc(self, control: int, value: int) -> None:
         self.inner_instrument.cc(control, value)
 
+    def pitch_bend(self, value: int, channel: int = 0) -> None:
+        self.inner_instrument.pitch_bend(self.bend_range * int(value) / 8192.0, channel=int(channel))
+
+    def set_note_offset(self, note: int, cents: float) -> None:
+        self.inner_instrument.set_note_offset(int(note), cents)
+
+    def handle_events(self, batch: np.ndarray) -> None:
+        """Batch of midi.messages.EVENT_DTYPE records, note-on frequencies looked up all at once."""
+        if batch.shape[0] == 0:
+            return
+        on = batch["type"] == NOTE_ON
+        freqs = np.zeros(batch.shape[0])     # other rows: data1 is a controller or a bend
+        if on.any():
+            notes = batch["data1"][on]
+            if isinstance(self._midi_to_freq, TuningTable):
+                freqs[on] = self._midi_to_freq.freqs[np.clip(notes, 0, 127)]   # as TuningTable.__call__
+            else:
+                freqs[on] = [self._midi_to_freq(n) for n in notes.tolist()]
+        chans = batch["channel"]
+        if (chans == chans[0]).all():
+            self.inner_instrument.handle_events(batch, freqs, self.bend_range, channel=int(chans[0]))
+            return
+        # mixed channels: one call per run of equal channels, keeping the event order
+        cut = np.flatnonzero(np.diff(chans)) + 1
+        for lo, hi in zip(np.r_[0, cut], np.r_[cut, batch.shape[0]]):
+            self.inner_instrument.handle_events(batch[lo:hi], freqs[lo:hi], self.bend_range,
+                                                channel=int(chans[lo]))
+
     def render(self, frames: int, sr: int) -> np.ndarray:
         return self.inner_instrument.render(frames, sr)
 
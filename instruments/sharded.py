@@ -0,0 +1,249 @@
+from __future__ import annotations
+import multiprocessing as mp
+import time
+import weakref
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List
+import numpy as np
+
+from . base import MidiInstrument
+from midi.messages import EVENT_DTYPE, NOTE_ON, NOTE_OFF, CONTROL_CHANGE, PITCH_BEND
+
+# per-worker control header (int64), in shared memory
+_CMD_WRITE, _CMD_READ, _REQ_SEQ, _REQ_FRAMES, _REQ_SR, _DONE_SEQ, _VOICES, _STOP = range(8)
+_HEADER = 8
+
+
+class _Shard:
+    """Parent-side handles of one worker: shared header, command ring, output block."""
+    def __init__(self, ctx, ring_size: int, max_frames: int):
+        self.ring_size = ring_size
+        self.max_frames = max_frames
+        nbytes = _HEADER * 8 + ring_size * EVENT_DTYPE.itemsize + max_frames * 4
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.header, self.ring, self.out = _views(self.shm, ring_size, max_frames)
+        self.header[:] = 0
+        self.request = ctx.Semaphore(0)
+        self.done = ctx.Semaphore(0)
+        self.process = None
+        self.held = 0           # notes currently assigned (parent's load estimate)
+        self.dropped = 0        # events refused by a full command ring
+        self.missed = 0         # blocks not delivered before the deadline
+
+    def post(self, rec: tuple) -> None:
+        h = self.header
+        w = int(h[_CMD_WRITE])
+        if w - int(h[_CMD_READ]) >= self.ring_size:
+            self.dropped += 1
+            return
+        self.ring[w % self.ring_size] = rec
+        h[_CMD_WRITE] = w + 1       # publish after the record is written
+
+
+def _views(shm, ring_size: int, max_frames: int):
+    header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+    ring = np.ndarray((ring_size,), dtype=EVENT_DTYPE, buffer=shm.buf, offset=_HEADER * 8)
+    out = np.ndarray((max_frames,), dtype=np.float32, buffer=shm.buf,
+                     offset=_HEADER * 8 + ring_size * EVENT_DTYPE.itemsize)
+    return header, ring, out
+
+
+def _close_shards(shards: List[_Shard]) -> None:
+    """Stop the workers and free their shared memory (close() or finalizer; the list is emptied)."""
+    for sh in shards:
+        sh.header[_STOP] = 1
+        sh.request.release()
+    for sh in shards:
+        if sh.process is not None:
+            sh.process.join(timeout=2.0)
+            if sh.process.is_alive():
+                sh.process.terminate()
+        del sh.header, sh.ring, sh.out
+        sh.shm.close()
+        sh.shm.unlink()
+    shards.clear()
+
+
+def _dispatch(inst, batch: np.ndarray) -> None:
+    handle = getattr(inst, "handle_events", None)
+    if handle is not None:
+        handle(batch)
+        return
+    for kind, d1, d2 in zip(batch["type"].tolist(), batch["data1"].tolist(), batch["data2"].tolist()):
+        if kind == NOTE_ON:
+            inst.note_on(d1, d2)
+        elif kind == NOTE_OFF:
+            inst.note_off(d1)
+        elif kind == CONTROL_CHANGE:
+            inst.cc(d1, d2)
+        elif kind == PITCH_BEND:
+            inst.pitch_bend(d1)
+
+
+def _worker_main(builder, shm_name: str, ring_size: int, max_frames: int, request, done) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    header, ring, out = _views(shm, ring_size, max_frames)
+    inst = builder()
+    done.release()                  # built: ready for blocks
+    last = 0
+    try:
+        while not header[_STOP]:
+            if not request.acquire(timeout=0.1):
+                continue
+            seq = int(header[_REQ_SEQ])
+            if seq == last:
+                continue            # extra wake-up after a late block: already rendered
+            last = seq
+            # commands posted since the last block, in order
+            r, w = int(header[_CMD_READ]), int(header[_CMD_WRITE])
+            if w > r:
+                idx = np.arange(r, w) % ring_size
+                batch = ring[idx].copy()
+                header[_CMD_READ] = w
+                _dispatch(inst, batch)
+            frames = int(header[_REQ_FRAMES])
+            out[:frames] = inst.render(frames, int(header[_REQ_SR]))
+            header[_VOICES] = inst.num_active_voices()
+            header[_DONE_SEQ] = seq
+            done.release()
+    finally:
+        del header, ring, out
+        shm.close()
+
+
+class ShardedInstrument(MidiInstrument):
+    """
+    One instrument spread over `workers` processes, each rendering its share of
+    the voices outside this process's GIL.
+
+    Each worker builds its own copy with `builder` (a picklable callable returning a
+    MidiInstrument: a module-level function or functools.partial). Notes go to the
+    least loaded worker and their note-off follows them; CC and pitch bend go to
+    every worker. Commands travel through a lock-free ring in shared memory, and
+    every worker renders into its own shared block, summed here.
+
+    The constructor returns once every worker has built its instrument (up to
+    `startup_timeout` seconds). render() wakes all workers and waits for them
+    until `deadline` (fraction of the block duration). A worker that misses it
+    contributes silence for that block (counted in `missed_blocks`); its late
+    block is discarded. `close()` (or garbage collection, or interpreter exit)
+    stops the workers and unlinks their shared memory.
+    """
+    def __init__(self, builder: Callable[[], MidiInstrument], workers: int = 2,
+                 max_frames: int = 4096, ring_size: int = 1024, deadline: float = 0.8,
+                 start_method: str = "spawn", startup_timeout: float = 30.0):
+        ctx = mp.get_context(start_method)
+        self.deadline = float(deadline)
+        self.max_frames = int(max_frames)
+        self._seq = 0
+        self._owner: Dict[int, _Shard] = {}
+        self._shards: List[_Shard] = []
+        # workers and segments are released by close(), or when the instrument is dropped
+        self._finalizer = weakref.finalize(self, _close_shards, self._shards)
+        try:
+            for _ in range(max(1, int(workers))):
+                sh = _Shard(ctx, int(ring_size), self.max_frames)
+                sh.process = ctx.Process(target=_worker_main, daemon=True,
+                                         args=(builder, sh.shm.name, sh.ring_size, sh.max_frames,
+                                               sh.request, sh.done))
+                self._shards.append(sh)
+                sh.process.start()
+            end = time.perf_counter() + float(startup_timeout)
+            for sh in self._shards:
+                if not sh.done.acquire(timeout=max(0.0, end - time.perf_counter())):
+                    raise RuntimeError(f"Shard worker not ready after {startup_timeout} s.")
+        except Exception:
+            self.close()
+            raise
+
+    ###########################################################################
+    ##                               EVENTS                                  ##
+    ###########################################################################
+
+    def note_on(self, note: int, velocity: int) -> None:
+        note = int(note)
+        if note in self._owner:
+            self.note_off(note)     # retrigger: release on the old worker
+        sh = min(self._shards, key=lambda s: s.held)
+        sh.held += 1
+        self._owner[note] = sh
+        sh.post((NOTE_ON, 0, note, int(velocity), 0))
+
+    def note_off(self, note: int) -> None:
+        sh = self._owner.pop(int(note), None)
+        if sh is not None:
+            sh.held -= 1
+            sh.post((NOTE_OFF, 0, int(note), 0, 0))
+
+    def cc(self, control: int, value: int) -> None:
+        for sh in self._shards:
+            sh.post((CONTROL_CHANGE, 0, int(control), int(value), 0))
+
+    def pitch_bend(self, value: int) -> None:
+        for sh in self._shards:
+            sh.post((PITCH_BEND, 0, int(value), 0, 0))
+
+    def handle_events(self, batch: np.ndarray) -> None:
+        for kind, d1, d2 in zip(batch["type"].tolist(), batch["data1"].tolist(), batch["data2"].tolist()):
+            if kind == NOTE_ON:
+                self.note_on(d1, d2)
+            elif kind == NOTE_OFF:
+                self.note_off(d1)
+            elif kind == CONTROL_CHANGE:
+                self.cc(d1, d2)
+            elif kind == PITCH_BEND:
+                self.pitch_bend(d1)
+
+    ###########################################################################
+    ##                              RENDERING                                ##
+    ###########################################################################
+
+    def render(self, frames: int, sr: int) -> np.ndarray:
+        if frames > self.max_frames:
+            raise ValueError(f"Block of {frames} frames exceeds max_frames={self.max_frames}.")
+        self._seq += 1
+        seq = self._seq
+        for sh in self._shards:
+            h = sh.header
+            h[_REQ_FRAMES] = frames
+            h[_REQ_SR] = sr
+            h[_REQ_SEQ] = seq
+            sh.request.release()
+
+        mix = np.zeros(frames, dtype=np.float32)
+        end = time.perf_counter() + self.deadline * frames / float(sr)
+        for sh in self._shards:
+            # stale releases from late blocks are skipped by checking the sequence number
+            while sh.header[_DONE_SEQ] != seq:
+                left = end - time.perf_counter()
+                if left <= 0 or not sh.done.acquire(timeout=left):
+                    break
+            if sh.header[_DONE_SEQ] == seq:
+                mix += sh.out[:frames]
+            else:
+                sh.missed += 1
+        return mix
+
+    def num_active_voices(self) -> int:
+        return int(sum(int(sh.header[_VOICES]) for sh in self._shards))
+
+    @property
+    def missed_blocks(self) -> int:
+        return sum(sh.missed for sh in self._shards)
+
+    @property
+    def dropped_events(self) -> int:
+        return sum(sh.dropped for sh in self._shards)
+
+    ###########################################################################
+    ##                              LIFECYCLE                                ##
+    ###########################################################################
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def __enter__(self) -> "ShardedInstrument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,7 +1,5 @@
 from typing import Protocol
 import numpy as np
-import matplotlib.pyplot as plt
-import sounddevice as sd
 
 class Signal(Protocol):
     """A stateful, unlimited-time signal generator."""
@@ -17,6 +15,7 @@ class Signal(Protocol):
         """
         Render `frames` samples and plot them.
         """
+        import matplotlib.pyplot as plt     # optional, only needed to plot
         y = self.render(freq, frames)
         t = np.arange(frames) / sr
         plt.figure(figsize=(8, 3))
@@ -29,7 +28,7 @@ class Signal(Protocol):
         
         
     def play_sample(self, freq: float, T: float = 1.0, sr: int = 44100, blocking=True):
-        
+        import sounddevice as sd            # optional, only needed to play
         # Ensure float32 in [-1, 1] to avoid clipping
         sig = self.render(freq, int(T * sr), sr)
         if sig.dtype != np.float32:
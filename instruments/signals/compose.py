@@ -81,7 +81,26 @@ class SpectralStack(Signal):
         self.amps /= S
         
         self._phi0   = np.array([v[1] for _, v in items], dtype=np.float64)
+        self._init_state()
+
+    @classmethod
+    def from_arrays(cls, ratios: np.ndarray, amps: np.ndarray, phi0: np.ndarray) -> "SpectralStack":
+        """
+        Stack over precompiled arrays (sorted ratios, normalized amplitudes, initial
+        phases), shared read-only between stacks: only the phases are per stack.
+        """
+        self = cls.__new__(cls)
+        self.ratios, self.amps, self._phi0 = ratios, amps, phi0
+        self._init_state()
+        return self
+
+    def _init_state(self) -> None:
         self.phases  = np.mod(self._phi0, 2.0 * np.pi)
+        self.last_active = np.zeros(self.ratios.size, dtype=bool)   # partials under Nyquist, last render
+        # pitch multiplier (bend, tuning offset): glides from `pitch` to `target_pitch`
+        # over the next block, as a linear ramp of the phase increments
+        self.pitch = 1.0
+        self.target_pitch = 1.0
         
         
         
@@ -100,8 +119,11 @@ class SpectralStack(Signal):
             return outP[:0, :], []
 
         f0 = float(freq); nyq = 0.5 * float(sr)
+        m0, m1 = self.pitch, self.target_pitch
+        self.pitch = m1
         f_partials = self.ratios * f0
-        active = (f_partials > 0.0) & (f_partials < nyq)
+        active = (f_partials > 0.0) & (f_partials * max(m0, m1) < nyq)
+        self.last_active = active
         if not np.any(active):
             return outP[:0, :], []
 
@@ -115,13 +137,21 @@ class SpectralStack(Signal):
         n = np.arange(frames, dtype=np.float64)
 
         # vectorized per-partial phase ramps
-        # phi_k[n] = phi0_k + n * inc_k
-        phi_mat = phi[:, None] + n[None, :] * inc[:, None]
+        # phi_k[n] = phi0_k + inc_k * ramp[n], ramp[n] = sum of the pitch multipliers
+        # before n; with the multiplier going linearly from m0 to m1 over the block,
+        # ramp[n] = m0 n + (m1 - m0) n (n-1) / (2 frames), shared by all partials
+        if m0 == m1:
+            ramp = n * m0
+            total = frames * m0
+        else:
+            ramp = n * m0 + (m1 - m0) * (n * (n - 1.0)) / (2.0 * frames)
+            total = frames * m0 + (m1 - m0) * (frames - 1.0) / 2.0
+        phi_mat = phi[:, None] + ramp[None, :] * inc[:, None]
         phi_mat = phi_mat - np.floor(phi_mat / two_pi) * two_pi
         Y[:] = (np.sin(phi_mat) * amps[:, None]).astype(np.float32)
 
         # advance phases by frames samples
-        self.phases[active] = (phi + frames * inc) % two_pi
+        self.phases[active] = (phi + total * inc) % two_pi
         return Y, list(ratios)
         
         
@@ -138,5 +168,7 @@ class SpectralStack(Signal):
     
     
     def reset(self) -> None:
-        """Reset all stored phases to the initial phases."""
-        self._phi = np.mod(self._phi0, 2.0 * np.pi)
+        """Reset all stored phases to the initial phases, and the pitch to 1."""
+        self.phases = np.mod(self._phi0, 2.0 * np.pi)
+        self.last_active[:] = False
+        self.pitch = self.target_pitch = 1.0
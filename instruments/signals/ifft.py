@@ -0,0 +1,97 @@
+import numpy as np
+from typing import Callable, Tuple
+
+FrameFn = Callable[[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+class IFFTSynth:
+    """
+    Additive synthesis by inverse FFT (the FFT^-1 method).
+
+    Each frame, every partial is written into one spectrum as the main lobe of a
+    Hann window centered on its (fractional) bin; one irfft then yields all
+    partials at once, and frames of 2*hop samples are overlap-added with hop
+    `hop` (periodic Hann sums to one at 50% overlap). Cost per frame is one FFT
+    plus O(partials * half_width) for the spectral writes, so it barely depends
+    on the number of partials. Frequencies and amplitudes are held per frame:
+    envelopes are sampled at frame rate, transitions are Hann crossfades.
+    """
+    def __init__(self, hop: int = 256, half_width: int = 8, oversample: int = 128):
+        self.hop = int(hop)
+        self.N = 2 * self.hop
+        self.half_width = int(half_width)
+        self.oversample = int(oversample)
+
+        # zero-phase periodic Hann and its transform, sampled every 1/oversample bin
+        N, O = self.N, self.oversample
+        w = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(N) / N)
+        w0 = np.roll(w, -N // 2)
+        padded = np.zeros(N * O)
+        padded[:N // 2] = w0[:N // 2]
+        padded[-N // 2:] = w0[N // 2:]
+        self._kernel = np.fft.rfft(padded).real[:self.half_width * O + 2]
+        self._offsets = np.arange(-self.half_width + 1, self.half_width + 1)
+
+        self.reset()
+
+    def reset(self) -> None:
+        self._tail = np.zeros(self.hop, dtype=np.float64)    # right half of the last frame
+        self._pending = np.zeros(0, dtype=np.float32)        # synthesized, not yet returned
+
+    def _lobe(self, d: np.ndarray) -> np.ndarray:
+        """Window transform at |distance| d (bins), linearly interpolated from the table."""
+        x = d * self.oversample
+        i = x.astype(np.intp)
+        frac = x - i
+        return self._kernel[i] * (1.0 - frac) + self._kernel[i + 1] * frac
+
+    def frame(self, freqs: np.ndarray, amps: np.ndarray, phases: np.ndarray, sr: int) -> np.ndarray:
+        """
+        One frame of sin(phase) partials (phase at the frame center). Returns `hop`
+        output samples: the tail of the previous frame plus the head of this one.
+        """
+        N, K = self.N, self.half_width
+        half = N // 2
+        b = freqs * (N / float(sr))
+        keep = (b > 0.0) & (b < half - K) & (amps != 0.0)
+        b, a, ph = b[keep], amps[keep], phases[keep]
+
+        X = np.zeros(half + 1, dtype=np.complex128)
+        if b.size:
+            kb = np.floor(b).astype(np.intp)[:, None] + self._offsets[None, :]   # (P, 2K)
+            lobe = self._lobe(np.abs(kb - b[:, None]))
+            # sin(phase) = cos(phase - pi/2); X[k] = a/2 e^{i phi} W(k - b)
+            vals = (0.5 * a * np.exp(1j * (ph - 0.5 * np.pi)))[:, None] * lobe
+            kb = kb.ravel()
+            vals = vals.ravel()
+
+            # bins at or below DC also receive the negative-frequency image (conjugate);
+            # at DC both terms add up to a real value
+            pos = kb >= 0
+            low = kb <= 0
+            idx = np.concatenate([kb[pos], -kb[low]])
+            v = np.concatenate([vals[pos], np.conj(vals[low])])
+            X.real = np.bincount(idx, weights=v.real, minlength=half + 1)
+            X.imag = np.bincount(idx, weights=v.imag, minlength=half + 1)
+
+        y = np.roll(np.fft.irfft(X, n=N), half)    # window centered at half
+        out = self._tail + y[:half]
+        self._tail = y[half:].copy()
+        return out
+
+    def render(self, frames: int, sr: int, frame_fn: FrameFn) -> np.ndarray:
+        """
+        Return `frames` samples. `frame_fn(hop, sr)` is called once per frame and
+        returns (freqs, amps, phases) of all partials at that frame's center.
+        """
+        out = np.empty(frames, dtype=np.float32)
+        n = min(frames, self._pending.shape[0])
+        out[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        while n < frames:
+            blk = self.frame(*frame_fn(self.hop, sr), sr).astype(np.float32)
+            m = min(frames - n, self.hop)
+            out[n:n + m] = blk[:m]
+            self._pending = blk[m:]
+            n += m
+        return out
@@ -1,5 +1,7 @@
 import numpy as np
 from .base import Signal
+import kernels
+from kernels import loops
 
 class Sine(Signal):
     def __init__(self, phase: float = 0.0, gain: float = 1.0):
@@ -29,18 +31,12 @@ class SawNaive(Signal):
     def __init__(self, phase: float = 0.0, gain: float = 1.0):
         self.gain = float(gain)
         self.phase = float(phase) % 1.0  # phase in [0,1)
-
+        kernels.prepare("saw_naive")
 
     def render(self, freq: float, frames: int, sr: int = 44100) -> np.ndarray:
         out = np.empty(frames, dtype=np.float32)
-        phase = self.phase
-        inc = freq / sr
-        for i in range(frames):
-            phase += inc
-            if phase >= 1.0:
-                phase -= 1.0
-            out[i] = 2.0 * phase - 1.0
-        self.phase = phase
+        saw = kernels.jit("saw_naive") or loops.saw_naive
+        self.phase = saw(out, self.phase, float(freq) / sr)
         return out * self.gain
 
     def reset(self) -> None:
@@ -0,0 +1,67 @@
+import numpy as np
+from fractions import Fraction
+from typing import Sequence
+
+
+class TuningTable:
+    """
+    MIDI note -> frequency, as a 128-entry array built once. Callable like the
+    `midi_to_freq` functions (note -> Hz), so it can be passed to MidiInstrumentAdapter.
+    """
+    def __init__(self, freqs: Sequence[float]):
+        self.freqs = np.asarray(freqs, dtype=np.float64)
+        if self.freqs.shape != (128,):
+            raise ValueError(f"A tuning table needs 128 frequencies, got shape {self.freqs.shape}.")
+
+    def __call__(self, note: int) -> float:
+        return float(self.freqs[min(127, max(0, int(note)))])
+
+    @classmethod
+    def equal_tempered(cls, n_tones: int = 12, base_note: int = 69,
+                       base_freq: float = 440.0) -> "TuningTable":
+        """n-TET: `n_tones` equal steps per octave, `base_note` at `base_freq`."""
+        steps = np.arange(128) - int(base_note)
+        return cls(float(base_freq) * 2.0 ** (steps / float(n_tones)))
+
+    @classmethod
+    def from_scale(cls, ratios: Sequence[float], base_note: int = 60,
+                   base_freq: float = 261.6255653) -> "TuningTable":
+        """
+        Periodic scale: `ratios` are the degrees above the unison, the last one
+        being the period (2.0 for an octave-repeating scale), as in a Scala file.
+        `base_note` plays the unison, at `base_freq`.
+        """
+        ratios = np.asarray(ratios, dtype=np.float64)
+        if ratios.size == 0:
+            raise ValueError("A scale needs at least one degree (its period).")
+        degrees = np.concatenate([[1.0], ratios[:-1]])
+        period = ratios[-1]
+        steps = np.arange(128) - int(base_note)
+        octave, degree = np.divmod(steps, ratios.size)
+        return cls(float(base_freq) * degrees[degree] * period ** octave)
+
+    @classmethod
+    def from_scala(cls, path: str, base_note: int = 60,
+                   base_freq: float = 261.6255653) -> "TuningTable":
+        """Load a Scala .scl file (pitches in cents, or ratios such as 3/2 or 2)."""
+        return cls.from_scale(read_scala(path), base_note=base_note, base_freq=base_freq)
+
+
+def read_scala(path: str) -> np.ndarray:
+    """Degrees of a Scala .scl file, as frequency ratios (period last)."""
+    with open(path, "r", encoding="latin-1") as f:
+        lines = [ln.strip() for ln in f if not ln.lstrip().startswith("!")]
+    # line 0: description, line 1: number of notes, then one pitch per line
+    if len(lines) < 2:
+        raise ValueError(f"'{path}' is not a Scala file.")
+    count = int(lines[1].split()[0])
+    ratios = []
+    for ln in lines[2:2 + count]:
+        value = ln.split()[0]
+        if "." in value:
+            ratios.append(2.0 ** (float(value) / 1200.0))    # cents
+        else:
+            ratios.append(float(Fraction(value)))            # ratio or integer
+    if len(ratios) != count:
+        raise ValueError(f"'{path}' announces {count} pitches, found {len(ratios)}.")
+    return np.array(ratios, dtype=np.float64)
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Dict, Hashable, Iterable, Iterator, List, Set
+from . base import Voice
+
+
+class VoiceState(Enum):
+    HELD = auto()        # key down
+    SUSTAINED = auto()   # key up, held by the sustain pedal
+    RELEASING = auto()   # gate off sent, envelope tail running
+
+
+@dataclass(eq=False)
+class VoiceSlot:
+    key: Hashable        # (note, channel), or (freq, channel) for frequency-only callers
+    voice: Voice
+    state: VoiceState = VoiceState.HELD
+    filter_slot: int = -1
+
+
+class VoiceTable:
+    """
+    Active voices, indexed by key. Several voices may share a key (retriggers keep
+    their release tails), so note-off and pedal-up only touch the voices concerned.
+    Not thread-safe: the owning instrument holds its lock.
+    """
+    def __init__(self):
+        self.slots: List[VoiceSlot] = []                  # render order
+        self._by_key: Dict[Hashable, List[VoiceSlot]] = {}
+        self._sustained: Set[VoiceSlot] = set()
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __iter__(self) -> Iterator[VoiceSlot]:
+        return iter(self.slots)
+
+    def voices_of(self, key: Hashable) -> List[VoiceSlot]:
+        return self._by_key.get(key, [])
+
+    def add(self, key: Hashable, voice: Voice, filter_slot: int = -1) -> VoiceSlot:
+        slot = VoiceSlot(key, voice, VoiceState.HELD, filter_slot)
+        self.slots.append(slot)
+        self._by_key.setdefault(key, []).append(slot)
+        return slot
+
+    def release(self, key: Hashable, sustain: bool) -> None:
+        """Key up: held voices of `key` go to SUSTAINED (pedal down) or RELEASING."""
+        for slot in self._by_key.get(key, ()):
+            if slot.state != VoiceState.HELD:
+                continue
+            if sustain:
+                slot.state = VoiceState.SUSTAINED
+                self._sustained.add(slot)
+            else:
+                slot.state = VoiceState.RELEASING
+                slot.voice.note_off()
+
+    def release_sustained(self) -> None:
+        """Pedal up: release every voice the pedal was holding."""
+        for slot in self._sustained:
+            slot.state = VoiceState.RELEASING
+            slot.voice.note_off()
+        self._sustained.clear()
+
+    def remove(self, dead: Iterable[VoiceSlot]) -> None:
+        dead = set(dead)
+        if not dead:
+            return
+        self.slots = [s for s in self.slots if s not in dead]
+        for slot in dead:
+            same = self._by_key.get(slot.key)
+            if same is not None:
+                same.remove(slot)
+                if not same:
+                    del self._by_key[slot.key]
+            self._sustained.discard(slot)
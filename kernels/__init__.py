@@ -0,0 +1,81 @@
+"""
+Optional JIT kernel layer.
+
+Hot per-sample loops (kernels.loops) are compiled with Numba when it is installed;
+otherwise callers keep their NumPy implementations, with identical output.
+Numba is only imported by `prepare`, which components call when they are built
+(never from the audio thread): compiled kernels are cached on disk, so later
+runs only load them.
+
+Backend: "auto" (Numba if available), "numba" or "numpy"; from the
+MUSICLAB_KERNELS environment variable or `set_backend`. Switching backends
+recompiles (or drops) every kernel prepared so far, so components built
+earlier follow the switch on their next block.
+"""
+import os
+from typing import Callable, Dict, Optional, Set
+
+from . import loops
+
+BACKENDS = ("auto", "numba", "numpy")
+
+_mode = os.environ.get("MUSICLAB_KERNELS", "auto")
+_numba = None                              # numba module, or False if unavailable
+_compiled: Dict[str, Callable] = {}
+_prepared: Set[str] = set()                # every kernel asked for, whatever the backend
+
+
+def _load_numba():
+    global _numba
+    if _numba is None:
+        try:
+            import numba
+            _numba = numba
+        except ImportError:
+            _numba = False
+    return _numba
+
+
+def set_backend(mode: str) -> None:
+    """
+    Switch backends, recompiling the kernels already prepared (call it from a
+    control thread: it may compile). Renders in progress keep a consistent set
+    of kernels: the table is replaced, not edited.
+    """
+    global _mode, _compiled
+    if mode not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{mode}', expected one of {BACKENDS}.")
+    if mode == "numba" and not _load_numba():
+        raise ImportError("The numba kernel backend needs numba installed.")
+    _mode = mode
+    compiled: Dict[str, Callable] = {}
+    _compile(sorted(_prepared), compiled)
+    _compiled = compiled
+
+
+def backend() -> str:
+    """Backend in use: "numba" or "numpy"."""
+    return "numba" if _mode != "numpy" and _load_numba() else "numpy"
+
+
+def prepare(*names: str) -> None:
+    """Compile (or load from the cache) the named kernels, if the Numba backend is in use."""
+    _prepared.update(names)
+    _compile(names, _compiled)
+
+
+def _compile(names, into: Dict[str, Callable]) -> None:
+    if _mode == "numpy":
+        return
+    for name in names:
+        if name in into:
+            continue
+        numba = _load_numba()
+        if not numba:
+            return
+        into[name] = numba.njit(loops.SIGNATURES[name], cache=True)(getattr(loops, name))
+
+
+def jit(name: str) -> Optional[Callable]:
+    """Compiled kernel, or None: use the NumPy implementation."""
+    return _compiled.get(name)
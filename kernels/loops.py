@@ -0,0 +1,121 @@
+"""
+Per-sample kernels, written as plain Python loops over NumPy arrays so that the
+same source runs under Numba. Float32 results are computed with float32
+operations in the same order as the NumPy implementations they replace, so both
+backends produce identical samples.
+"""
+import numpy as np
+
+# ADSRState values (instruments.envelopes.adsr)
+IDLE, ATTACK, DECAY, SUSTAIN, RELEASE = 1, 2, 3, 4, 5
+
+# explicit signatures: Numba compiles at `kernels.prepare` time, not on first call
+SIGNATURES = {
+    "adsr_render": "Tuple((int64, float64, float64))(float32[::1], int64, float64, float64, "
+                   "float64, int64, int64, int64, float64, int64)",
+    "peak_render": "void(float32[::1], float64, float64, float64, float64)",
+    "saw_naive": "float64(float32[::1], float64, float64)",
+    "biquad_rows": "void(float64[:, ::1], float64[:, ::1], float64[:, ::1])",
+    "peak_energy": "UniTuple(float64, 2)(float32[::1])",
+}
+
+
+def adsr_render(out, state, t, y, rel_start, A, D, R, s, sr):
+    """ADSR.render state machine over `out`; returns (state, t, y)."""
+    frames = out.shape[0]
+    one = np.float32(1.0)
+    idx = 0
+    while idx < frames and state != IDLE:
+        remain = frames - idx
+        if state == SUSTAIN:
+            v = np.float32(s)
+            for j in range(idx, frames):
+                out[j] = v
+            y = s
+            idx = frames
+            continue
+
+        L = A if state == ATTACK else (D if state == DECAY else R)
+        elapsed = int(t * sr)
+        n = min(remain, max(0, L - elapsed))
+        den = np.float32(L - 1)
+        for j in range(n):
+            if L <= 1:
+                v = one if state == ATTACK else (np.float32(s) if state == DECAY else np.float32(0.0))
+            elif state == ATTACK:
+                v = np.float32(elapsed + j) / den
+            elif state == DECAY:
+                v = one + np.float32(s - 1.0) * (np.float32(elapsed + j) / den)
+            else:
+                v = np.float32(rel_start) * (one - np.float32(elapsed + j) / den)
+            out[idx + j] = v
+        if n > 0:
+            y = float(out[idx + n - 1])
+        t += n / sr
+        idx += n
+
+        if int(t * sr) >= L:
+            t = 0.0
+            if state == ATTACK:
+                state = DECAY
+                y = 1.0
+            elif state == DECAY:
+                state = SUSTAIN
+                y = s
+            else:
+                state = IDLE
+                y = 0.0
+    return state, t, y
+
+
+def peak_render(out, t0, a, r, sr):
+    """PeakEnvelope levels at t0 + i/sr."""
+    for i in range(out.shape[0]):
+        t = t0 + i / sr
+        v = 0.0
+        if a > 0.0 and t >= 0 and t < a:
+            v = t / a
+        if r > 0.0 and t >= a and t < a + r:
+            v = 1.0 - (t - a) / r
+        out[i] = v
+
+
+def saw_naive(out, phase, inc):
+    """Naive saw with phase wrap in [0, 1); returns the new phase."""
+    for i in range(out.shape[0]):
+        phase += inc
+        if phase >= 1.0:
+            phase -= 1.0
+        out[i] = 2.0 * phase - 1.0
+    return phase
+
+
+def biquad_rows(x, sos, zi):
+    """
+    One biquad per row, in place: x (rows, frames), sos (rows, 6) normalized,
+    zi (rows, 2) updated. Transposed direct form II, as scipy's sosfilt.
+    """
+    for i in range(x.shape[0]):
+        b0, b1, b2 = sos[i, 0], sos[i, 1], sos[i, 2]
+        a1, a2 = sos[i, 4], sos[i, 5]
+        z0, z1 = zi[i, 0], zi[i, 1]
+        for n in range(x.shape[1]):
+            xc = x[i, n]
+            yn = b0 * xc + z0
+            z0 = b1 * xc - a1 * yn + z1
+            z1 = b2 * xc - a2 * yn
+            x[i, n] = yn
+        zi[i, 0] = z0
+        zi[i, 1] = z1
+
+
+def peak_energy(buf):
+    """(peak |x|, sum of x^2) in one pass; a meter reading, accumulated in float64."""
+    peak = 0.0
+    sumsq = 0.0
+    for i in range(buf.shape[0]):
+        x = np.float64(buf[i])
+        if abs(x) > peak:
+            peak = abs(x)
+        sumsq += x * x
+    return peak, sumsq
@@ -0,0 +1,55 @@
+import heapq
+from typing import Iterator, Tuple
+import mido
+
+from midi.messages import NOTE_ON, NOTE_OFF, CONTROL_CHANGE, PITCH_BEND
+
+DEFAULT_TEMPO = 500000      # µs per beat (120 BPM), until the first set_tempo
+
+
+def _track_messages(track, index: int):
+    """(absolute tick, track index, message) of one track, lazily."""
+    tick = 0
+    for msg in track:
+        tick += msg.time
+        yield tick, index, msg
+
+
+def _record(msg) -> Tuple[int, int, int, int]:
+    """mido message -> (type, channel, data1, data2), or None for unsupported messages."""
+    t = msg.type
+    if t == 'note_on' and msg.velocity > 0:
+        return (NOTE_ON, msg.channel, msg.note, msg.velocity)
+    if t == 'note_off' or t == 'note_on':
+        return (NOTE_OFF, msg.channel, msg.note, 0)
+    if t == 'control_change':
+        return (CONTROL_CHANGE, msg.channel, msg.control, msg.value)
+    if t == 'pitchwheel':
+        return (PITCH_BEND, msg.channel, msg.pitch, 0)
+    return None
+
+
+def iter_midi_file(path: str, sr: int = 44100) -> Iterator[Tuple[int, Tuple[int, int, int, int]]]:
+    """
+    Events of a Standard MIDI File as (sample position, (type, channel, data1, data2)),
+    in time order. Tracks are merged lazily and the tempo map is applied on the fly:
+    positions are counted in ticks from the last tempo change, so they do not drift.
+    """
+    mf = mido.MidiFile(path)
+    if mf.type == 2:
+        raise ValueError(f"'{path}': asynchronous (type 2) MIDI files are not supported.")
+    tpb = mf.ticks_per_beat
+    merged = heapq.merge(*(_track_messages(tr, i) for i, tr in enumerate(mf.tracks)),
+                         key=lambda item: (item[0], item[1]))
+
+    tempo = DEFAULT_TEMPO
+    base_tick, base_sample = 0, 0.0
+    for tick, _, msg in merged:
+        sample = base_sample + (tick - base_tick) * tempo * sr / (tpb * 1e6)
+        if msg.type == 'set_tempo':
+            tempo = msg.tempo
+            base_tick, base_sample = tick, sample
+            continue
+        rec = _record(msg)
+        if rec is not None:
+            yield int(round(sample)), rec
@@ -1,5 +1,5 @@
-import mido, threading
-from midi.messages import NoteOn, NoteOff, CC
+import mido, threading, time
+from midi.messages import NoteOn, NoteOff, CC, PitchBend
 from routing.bus import EventBus
 
 def start_midi_listener(bus: EventBus, port_name_substr="Roland"):
@@ -16,12 +16,15 @@ def start_midi_listener(bus: EventBus, port_name_substr="Roland"):
         
         with mido.open_input(inp) as port:
             for msg in port:
+                t = time.perf_counter() if bus.timestamps else None    # receipt time
                 if msg.type == 'note_on' and msg.velocity > 0:
-                    bus.post(NoteOn(msg.note, msg.velocity, getattr(msg, 'channel', 0)))
+                    bus.post(NoteOn(msg.note, msg.velocity, getattr(msg, 'channel', 0)), t=t)
                 elif msg.type in ('note_off',) or (msg.type == 'note_on' and msg.velocity == 0):
-                    bus.post(NoteOff(msg.note, 0, getattr(msg, 'channel', 0)))
+                    bus.post(NoteOff(msg.note, 0, getattr(msg, 'channel', 0)), t=t)
                 elif msg.type == 'control_change':
-                    bus.post(CC(msg.control, msg.value, getattr(msg, 'channel', 0)))
+                    bus.post(CC(msg.control, msg.value, getattr(msg, 'channel', 0)), t=t)
+                elif msg.type == 'pitchwheel':
+                    bus.post(PitchBend(msg.pitch, getattr(msg, 'channel', 0)), t=t)
 
     th = threading.Thread(target=run, daemon=True); th.start()
     return th
@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+from typing import Iterable
+import numpy as np
 
 @dataclass(frozen=True)
 class NoteOn:  
@@ -17,3 +19,48 @@ class CC:
     control: int
     value: int
     channel: int = 0
+
+@dataclass(frozen=True)
+class PitchBend:
+    value: int               # -8192..8191, 0 = center
+    channel: int = 0
+
+
+###############################################################################
+##                              EVENT BATCHES                                ##
+###############################################################################
+
+# Compact form used between the bus, the mixer and the instruments: one record
+# per event in a structured array. `offset` is the frame within the block.
+NOTE_ON, NOTE_OFF, CONTROL_CHANGE, PITCH_BEND = 1, 2, 3, 4
+
+EVENT_DTYPE = np.dtype([
+    ("type", np.uint8),
+    ("channel", np.uint8),
+    ("data1", np.int16),      # note / control / bend value
+    ("data2", np.int16),      # velocity / control value
+    ("offset", np.int32),
+])
+
+
+def encode(e, offset: int = 0) -> tuple:
+    """NoteOn/NoteOff/CC/PitchBend -> record tuple (see EVENT_DTYPE)."""
+    if isinstance(e, NoteOn):
+        return (NOTE_ON, e.channel, e.note, e.velocity, offset)
+    if isinstance(e, NoteOff):
+        return (NOTE_OFF, e.channel, e.note, e.velocity, offset)
+    if isinstance(e, CC):
+        return (CONTROL_CHANGE, e.channel, e.control, e.value, offset)
+    if isinstance(e, PitchBend):
+        return (PITCH_BEND, e.channel, e.value, 0, offset)
+    raise TypeError(f"Unsupported event {e!r}")
+
+
+def to_batch(events: Iterable) -> np.ndarray:
+    """Event objects and/or record tuples -> structured array."""
+    return np.array([e if isinstance(e, tuple) else encode(e) for e in events],
+                    dtype=EVENT_DTYPE)
+
+
+def empty_batch() -> np.ndarray:
+    return np.zeros(0, dtype=EVENT_DTYPE)
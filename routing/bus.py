@@ -1,21 +1,57 @@
+from collections import deque
 import queue
-from typing import Union
-from midi.messages import NoteOn, NoteOff, CC
+import time
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from midi.messages import NoteOn, NoteOff, CC, PitchBend, EVENT_DTYPE, encode, empty_batch
 
-Event = Union[NoteOn, NoteOff, CC]
+Event = Union[NoteOn, NoteOff, CC, PitchBend]
 
 class EventBus:
-    def __init__(self, maxsize=1024) -> None:
-        self.q = queue.Queue(maxsize=maxsize)
+    """
+    Events from any thread to the audio callback. Posted events are stored as
+    record tuples and drained as one structured array (midi.messages.EVENT_DTYPE).
+    deque append/popleft are atomic: no lock on either side.
 
-    def post(self, e: Event) -> None:
-        self.q.put_nowait(e)
+    With `timestamps` on (latency measurement, see audio.latency), each event
+    carries its post time (time.perf_counter, or `t` given by the poster), read
+    back with `drain_timed`.
+    """
+    def __init__(self, maxsize=1024, timestamps: bool = False) -> None:
+        self.maxsize = int(maxsize)
+        self.timestamps = bool(timestamps)
+        self.q: deque = deque()
 
-    def drain(self, max_events=128):
-        evs = []
-        try:
-            while len(evs) < max_events:
-                evs.append(self.q.get_nowait())
-        except queue.Empty:
-            pass
-        return evs
+    def post(self, e: Event, t: Optional[float] = None) -> None:
+        self.post_raw(*encode(e), t=t)
+
+    def post_raw(self, type: int, channel: int, data1: int, data2: int = 0, offset: int = 0,
+                 t: Optional[float] = None) -> None:
+        """Post without building an event object (type codes from midi.messages)."""
+        if len(self.q) >= self.maxsize:
+            raise queue.Full
+        if self.timestamps:
+            self.q.append((type, channel, data1, data2, offset,
+                           time.perf_counter() if t is None else t))
+        else:
+            self.q.append((type, channel, data1, data2, offset))
+
+    def drain(self, max_events=128) -> np.ndarray:
+        if self.timestamps:
+            return self.drain_timed(max_events)[0]
+        q = self.q
+        n = min(len(q), max_events)
+        if n == 0:
+            return empty_batch()
+        return np.array([q.popleft() for _ in range(n)], dtype=EVENT_DTYPE)
+
+    def drain_timed(self, max_events=128) -> Tuple[np.ndarray, List[float]]:
+        """Batch and the post time of each event (drain time for events posted unstamped)."""
+        q = self.q
+        n = min(len(q), max_events)
+        if n == 0:
+            return empty_batch(), []
+        items = [q.popleft() for _ in range(n)]
+        now = time.perf_counter()
+        times = [it[5] if len(it) > 5 else now for it in items]
+        return np.array([it[:5] for it in items], dtype=EVENT_DTYPE), times
@@ -1,22 +1,134 @@
 import threading, time
+from typing import Callable, Optional, Tuple
+
+# tick lateness histogram: upper bin edges in ms (last bin: anything later)
+LATE_EDGES_MS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0)
+
 
 class Clock:
-    def __init__(self, bpm=120.0, ppq=24):
-        self.bpm = bpm; self.ppq = ppq; self.running = False
-        self._th = None
+    """
+    Tick clock (ppq ticks per beat) on its own thread.
+
+    Ticks are scheduled on an absolute timeline, each one period after the
+    previous, so sleep jitter never accumulates into drift. Each wait is a coarse
+    time.sleep until `spin` seconds before the tick, then a short spin (yielding
+    the GIL) up to the tick time. When the thread wakes up late, every tick that
+    is due fires at once, in order; beyond `max_catchup` due ticks (a long stall)
+    the excess is skipped and the timeline resumes from now.
+
+    The tempo can change while running, at once or as a linear ramp (`set_bpm`).
+    `stats` reports lateness (histogram, mean, max), ticks fired late by more
+    than one period (`missed`) and skipped ticks.
+    """
+    def __init__(self, bpm=120.0, ppq=24, spin: float = 0.002, max_catchup: int = 24):
+        self.ppq = ppq; self.running = False
+        self.spin = float(spin)
+        self.max_catchup = max(1, int(max_catchup))
+        self._th: Optional[threading.Thread] = None
+        self._ramp: Tuple[float, float, float, float] = (0.0, float(bpm), 0.0, float(bpm))
+        self.reset_stats()
+
+    ###########################################################################
+    ##                                TEMPO                                  ##
+    ###########################################################################
+
+    @property
+    def bpm(self) -> float:
+        return self.bpm_at(time.perf_counter())
+
+    @bpm.setter
+    def bpm(self, bpm: float) -> None:
+        self.set_bpm(bpm)
+
+    def set_bpm(self, bpm: float, ramp: float = 0.0) -> None:
+        """Change the tempo now, or linearly over `ramp` seconds (safe while running)."""
+        now = time.perf_counter()
+        self._ramp = (now, self.bpm_at(now), now + max(0.0, float(ramp)), float(bpm))
 
-    def start(self, tick_fn):
+    def bpm_at(self, t: float) -> float:
+        t0, b0, t1, b1 = self._ramp
+        if t >= t1:
+            return b1
+        if t <= t0:
+            return b0
+        return b0 + (b1 - b0) * (t - t0) / (t1 - t0)
+
+    def _period(self, t: float) -> float:
+        """Seconds per tick at time t."""
+        return 60.0 / (self.bpm_at(t) * self.ppq)
+
+    ###########################################################################
+    ##                                 RUN                                   ##
+    ###########################################################################
+
+    def start(self, tick_fn: Callable[[], None]):
         self.running = True
-        spb = 60.0 / self.bpm
-        spt = spb / self.ppq   # seconds per tick
         def run():
             next_t = time.perf_counter()
             while self.running:
-                tick_fn()
-                next_t += spt
-                sleep = next_t - time.perf_counter()
-                if sleep > 0: time.sleep(sleep)
-        self._th = threading.Thread(target=run, daemon=True); self._th.start()
+                self._wait_until(next_t)
+                now = time.perf_counter()
+                due = 0
+                while self.running and next_t <= now:
+                    if due == self.max_catchup:
+                        # stalled: skip what is left and restart the timeline from now
+                        while next_t <= now:
+                            next_t += self._period(next_t)
+                            self.skipped += 1
+                        break
+                    late = time.perf_counter() - next_t
+                    tick_fn()
+                    self._record(late, self._period(next_t))
+                    next_t += self._period(next_t)
+                    due += 1
+        self._th = threading.Thread(target=run, name="ClockThread", daemon=True); self._th.start()
+
+    def _wait_until(self, t: float) -> None:
+        left = t - time.perf_counter()
+        if left > self.spin:
+            time.sleep(left - self.spin)
+        while self.running and time.perf_counter() < t:
+            time.sleep(0)       # spin, letting other threads have the GIL
 
     def stop(self):
         self.running = False
+        if self._th is not None and self._th is not threading.current_thread():
+            self._th.join(timeout=1.0)
+        self._th = None
+
+    ###########################################################################
+    ##                               STATS                                   ##
+    ###########################################################################
+
+    def reset_stats(self) -> None:
+        self.ticks = 0
+        self.missed = 0             # fired more than one period late (caught up in a batch)
+        self.skipped = 0            # dropped after a stall longer than max_catchup ticks
+        self.late_counts = [0] * (len(LATE_EDGES_MS) + 1)
+        self._late_sum = 0.0
+        self._late_max = 0.0
+
+    def _record(self, late: float, period: float) -> None:
+        self.ticks += 1
+        if late > period:
+            self.missed += 1
+        ms = 1e3 * late
+        b = 0
+        while b < len(LATE_EDGES_MS) and ms > LATE_EDGES_MS[b]:
+            b += 1
+        self.late_counts[b] += 1
+        self._late_sum += late
+        if late > self._late_max:
+            self._late_max = late
+
+    def stats(self) -> dict:
+        """Tick lateness and missed/skipped counts since start (or reset_stats)."""
+        return {
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "skipped": self.skipped,
+            "bpm": self.bpm,
+            "mean_late_ms": 1e3 * self._late_sum / max(1, self.ticks),
+            "max_late_ms": 1e3 * self._late_max,
+            "late_hist_ms": {"edges": list(LATE_EDGES_MS), "counts": list(self.late_counts)},
+        }
@@ -15,6 +15,7 @@ class StepSequencer:
                  channel: int = 0, 
                  loop: bool = True):
         self.bus = bus
+        self.pattern_version = 0     # bumped by every pattern edit (see touch)
         self.steps = steps
         self.channel = int(channel)
         self.loop = bool(loop)
@@ -34,9 +35,45 @@ class StepSequencer:
         if gate_ticks and (self.tick_count % ticks_per_step) == gate_ticks:
             s = self.steps[self.idx]
             if s.pitch is not None:
-                print("-- Note off: ", self.channel)
-                self.bus.post(NoteOff(s.pitch, self.channel))
+                self.bus.post(NoteOff(s.pitch, channel=self.channel))
         if (self.tick_count % ticks_per_step) == (ticks_per_step - 1):
             self.idx = (self.idx + 1) % len(self.steps)
 
         self.tick_count += 1
+
+    # ---- pattern edits ----
+    @property
+    def steps(self) -> List[Step]:
+        return self._steps
+
+    @steps.setter
+    def steps(self, steps: List[Step]) -> None:
+        self._steps = steps
+        self.touch()
+
+    @property
+    def steps_per_beat(self) -> int:
+        return self._steps_per_beat
+
+    @steps_per_beat.setter
+    def steps_per_beat(self, steps_per_beat: int) -> None:
+        self._steps_per_beat = steps_per_beat
+        self.touch()
+
+    def set_step(self, i: int, step: Step) -> None:
+        self._steps[i] = step
+        self.touch()
+
+    def touch(self) -> None:
+        """Mark the pattern as edited; call it after changing a Step in place."""
+        self.pattern_version += 1
+
+    # ---- pattern description (used to freeze the track it drives) ----
+    def cycle_ticks(self, ppq=24) -> int:
+        """Length of one pass over the steps, in clock ticks."""
+        return (ppq // self.steps_per_beat) * len(self.steps)
+
+    def cycle_position(self, ppq=24) -> int:
+        """Tick offset of the current step's start within the cycle."""
+        return (ppq // self.steps_per_beat) * self.idx
+
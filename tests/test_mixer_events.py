@@ -0,0 +1,58 @@
+import numpy as np
+
+from audio.mixer import Mixer
+from instruments.additive import make_spectral_frequency, PartialCharacteristics
+from instruments.envelopes.adsr import ADSR
+from instruments.midi import MidiInstrumentAdapter
+from instruments.voices import VoiceState
+from midi.messages import NoteOn, NoteOff, CC, PitchBend, to_batch
+
+
+def make_poly():
+    p = {1.0: PartialCharacteristics(1.0, 0.0, ADSR(0.01, 0.1, 0.5, 0.1))}
+    return make_spectral_frequency(p)
+
+
+def test_frequency_instrument_track_gets_events_one_by_one():
+    mixer = Mixer()
+    mixer.add_track(0, make_poly())
+    mixer.route_events(to_batch([NoteOn(60, 100, 0), CC(1, 64, 0)]))
+    assert mixer.snapshot_tracks()[0][0][1].instrument.num_active_voices() == 1
+    assert mixer.render(64, 44100).shape == (64,)
+
+
+def test_midi_instrument_track_gets_batches():
+    mixer = Mixer()
+    mixer.add_track(0, MidiInstrumentAdapter(make_poly()))
+    (_, tr), = mixer.snapshot_tracks()[0]
+    assert tr.batch_events
+    mixer.route_events(to_batch([NoteOn(60, 100, 0), NoteOn(64, 100, 0), NoteOff(60, 0)]))
+    mixer.render(64, 44100)
+    assert tr.instrument.num_active_voices() == 2
+    assert np.any(mixer.render(64, 44100) != 0.0)
+
+
+def test_adapter_looks_up_frequencies_of_note_ons_only():
+    looked_up = []
+
+    def midi_to_freq(note):
+        assert 0 <= note <= 127
+        looked_up.append(note)
+        return 440.0
+
+    inst = MidiInstrumentAdapter(make_poly(), midi_to_freq=midi_to_freq)
+    inst.handle_events(to_batch([CC(74, 10), PitchBend(-8192), NoteOn(60, 100), NoteOff(60)]))
+    assert looked_up == [60]
+
+
+def test_adapter_keeps_channels_apart():
+    inst = MidiInstrumentAdapter(make_poly())
+    voices = inst.inner_instrument._voices
+    inst.handle_events(to_batch([NoteOn(60, 100, 0), NoteOn(60, 100, 1), NoteOff(60, 0)]))
+    assert [sl.state for sl in voices.voices_of((60, 0))] == [VoiceState.RELEASING]
+    assert [sl.state for sl in voices.voices_of((60, 1))] == [VoiceState.HELD]
+
+    inst.note_off(60, channel=1)
+    assert [sl.state for sl in voices.voices_of((60, 1))] == [VoiceState.RELEASING]
+    inst.note_on(62, 100, channel=1)
+    assert voices.voices_of((62, 1)) and not voices.voices_of((62, 0))